@@ -428,9 +428,12 @@ class Container:
             DualExecutionOrchestrator instance
         """
         if self._dual_execution_orchestrator is None:
+            config = self.get_config(config_path=config_path)
             llm_client = self.get_llm_client(config_path=config_path)
             memory_module = self.get_memory_module(config_path=config_path)
             self._dual_execution_orchestrator = DualExecutionOrchestrator(
-                llm_client=llm_client, memory_module=memory_module
+                llm_client=llm_client,
+                memory_module=memory_module,
+                diagnosis_store_path=config.storage.data_dir / "diagnoses",
             )
         return self._dual_execution_orchestrator
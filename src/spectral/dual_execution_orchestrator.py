@@ -5,14 +5,22 @@ Coordinates the dual execution mode system: routing, direct execution,
 complex step breakdown, monitoring, and adaptive fixing.
 """
 
+import atexit
+import hashlib
+import itertools
 import logging
-from typing import Callable, Generator, Optional
+import shelve
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Dict, Generator, Iterable, List, Optional, Tuple
 
 from spectral.adaptive_fixing import AdaptiveFixEngine
 from spectral.autonomous_pentesting_assistant import AutonomousPentestingAssistant
 from spectral.code_step_breakdown import CodeStepBreakdown
 from spectral.direct_executor import DirectExecutor
-from spectral.execution_models import CodeStep, ExecutionMode
+from spectral.execution_models import CodeStep, ExecutionMode, FailureDiagnosis
 from spectral.execution_monitor import ExecutionMonitor
 from spectral.execution_router import ExecutionRouter
 from spectral.llm_client import LLMClient
@@ -26,12 +34,163 @@ from spectral.utils import (
     SmartInputHandler,
     clean_code,
     ensure_utf8_header,
+    get_username,
     is_unicode_encoding_error,
     sanitize_unicode_chars,
 )
 
 logger = logging.getLogger(__name__)
 
+# Lines of step output kept for failure diagnosis; older lines are dropped so
+# long-running steps use bounded memory.
+_STEP_OUTPUT_TAIL_LINES = 4096
+
+# Error lines kept for error parsing; tracebacks put the useful part last
+_STEP_ERROR_TAIL_LINES = 256
+
+# Generated step code kept per orchestrator, keyed by prompt digest
+_STEP_CODE_CACHE_SIZE = 128
+
+# Code steps whose generation is requested ahead of the step being run. A local
+# backend serves one request at a time, so a deeper look-ahead only queues in
+# front of the running step's diagnosis and fix calls, and its requests are
+# wasted when a step fails and the plan is aborted.
+_CODEGEN_LOOKAHEAD = 1
+
+# Characters of error details that go into a persisted diagnosis key
+_DIAGNOSIS_KEY_DETAIL_CHARS = 1024
+
+# Diagnoses below this confidence are not persisted. The fallback returned when
+# the diagnosis call itself fails (e.g. the LLM backend is down) carries 0.3,
+# and persisting it would replay that failure in every later session.
+_DIAGNOSIS_MIN_STORED_CONFIDENCE = 0.5
+
+# Open diagnosis stores by resolved path, shared by every orchestrator in the
+# process so each file is opened once and closed once at exit
+_DIAGNOSIS_STORES: Dict[Path, shelve.Shelf] = {}
+_DIAGNOSIS_STORES_LOCK = threading.Lock()
+
+# Per-step code generation prompt. The static instructions come first and the
+# per-step task last, so LLM backends with prefix caching can reuse the shared
+# part across steps. Placeholders: username.
+_STEP_CODE_PROMPT_TEMPLATE = """
+
+═══════════════════════════════════════════════════════════════════════════════
+🔓 MULTI-STEP CODE GENERATION - FULL SYSTEM ACCESS
+═══════════════════════════════════════════════════════════════════════════════
+
+You have FULL SYSTEM ACCESS. Generate COMPLETE, WORKING code for the step
+described at the end of this prompt.
+
+═══════════════════════════════════════════════════════════════════════════════
+📋 REQUIREMENTS
+═══════════════════════════════════════════════════════════════════════════════
+
+1. COMPLETENESS:
+   - Write FULL implementation for THIS step only
+   - Include ALL necessary imports
+   - Make it immediately executable
+   - No TODO comments or placeholders
+
+2. FULL ACCESS CAPABILITIES:
+   - Read/write files anywhere: C:\\Users\\{username}\\
+   - Network operations with raw sockets
+   - System commands via subprocess
+   - Any pip packages (auto-installed)
+   - Desktop output: C:\\Users\\{username}\\Desktop
+
+3. ERROR HANDLING:
+   - Wrap risky operations in try/except
+   - Add timeouts for I/O operations:
+     * socket.settimeout(30)
+     * requests.get(url, timeout=10)
+     * thread.join(timeout=30)
+   - Log errors clearly
+
+4. AUTONOMY:
+   - Hard-code ALL test values
+   - NO input() calls
+   - No user interaction required
+   - Print progress messages
+
+5. ENCODING (WINDOWS SAFETY):
+   - Avoid Unicode-only math symbols in code/UI strings (e.g., √, ±, ∞). Prefer ASCII like "sqrt", "+/-", "inf".
+   - If non-ASCII is truly required, include a UTF-8 coding cookie at the top: # -*- coding: utf-8 -*-
+
+6. WINDOWS PATHS:
+   - Use pathlib.Path or os.path
+   - Home: C:\\Users\\{username}
+   - Desktop: C:\\Users\\{username}\\Desktop
+   - Temp: C:\\Users\\{username}\\AppData\\Local\\Temp
+   - Use raw strings: r'C:\\path' or Path()
+
+═══════════════════════════════════════════════════════════════════════════════
+🔍 VERIFICATION CHECKLIST (Before returning code)
+═══════════════════════════════════════════════════════════════════════════════
+
+✓ All imports correct and available
+✓ No infinite loops (all loops have exit conditions)
+✓ Timeouts on I/O operations (sockets, requests, threads)
+✓ Proper error handling (try/except blocks)
+✓ No input() calls or interactive prompts
+✓ Windows paths used correctly
+✓ Code is complete and immediately runnable
+
+═══════════════════════════════════════════════════════════════════════════════
+📤 OUTPUT FORMAT
+═══════════════════════════════════════════════════════════════════════════════
+
+Return ONLY valid Python code in a single code block:
+
+```python
+# Complete, working code for this step
+```
+
+Rules:
+- ONE ```python ... ``` block only
+- No explanations outside code
+- No markdown text before/after
+- Code must work on first execution"""
+
+# Per-step task section, appended after _STEP_CODE_PROMPT_TEMPLATE.
+# Placeholders: user_input, step_description, step_number.
+_STEP_CODE_TASK_TEMPLATE = """
+
+═══════════════════════════════════════════════════════════════════════════════
+🎯 CURRENT STEP
+═══════════════════════════════════════════════════════════════════════════════
+
+Original Request: {user_input}
+
+Current Step: {step_description}
+Step Number: {step_number}"""
+
+
+def _open_diagnosis_store(path: Path) -> Optional[shelve.Shelf]:
+    """
+    Open the persistent diagnosis store at path, reusing it if already open.
+
+    Args:
+        path: Shelve file path
+
+    Returns:
+        The open store, or None if it could not be opened
+    """
+    try:
+        path = path.resolve()
+        with _DIAGNOSIS_STORES_LOCK:
+            store = _DIAGNOSIS_STORES.get(path)
+            if store is None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                store = shelve.open(str(path))
+                _DIAGNOSIS_STORES[path] = store
+                atexit.register(store.close)
+                logger.debug(f"Diagnosis store opened at {path}")
+    except Exception as e:
+        logger.warning(f"Could not open diagnosis store at {path}: {e}")
+        return None
+    return store
+
 
 class DualExecutionOrchestrator:
     """
@@ -48,6 +207,7 @@ class DualExecutionOrchestrator:
         mistake_learner: Optional[MistakeLearner] = None,
         memory_module: Optional[MemoryModule] = None,
         gui_callback: Optional[Callable[..., None]] = None,
+        diagnosis_store_path: Optional[Path] = None,
     ) -> None:
         """
         Initialize dual execution orchestrator.
@@ -57,6 +217,8 @@ class DualExecutionOrchestrator:
             mistake_learner: Mistake learner for storing and retrieving patterns
             memory_module: Optional memory module for tracking executions
             gui_callback: Optional callback for sandbox viewer updates
+            diagnosis_store_path: Optional shelve file for persisting failure
+                diagnoses across sessions (in-memory only when None)
         """
         self.llm_client = llm_client
         self.mistake_learner = mistake_learner or MistakeLearner()
@@ -71,7 +233,21 @@ class DualExecutionOrchestrator:
         self.code_step_breakdown = CodeStepBreakdown(llm_client)
         self.execution_monitor = ExecutionMonitor()
         self.adaptive_fix_engine = AdaptiveFixEngine(llm_client, self.mistake_learner)
-        self.research_handler = ResearchIntentHandler()
+        # Created on first research request; it opens the research cache
+        self._research_handler: Optional[ResearchIntentHandler] = None
+        # The shared part of every step prompt only depends on the user, so
+        # render it once per orchestrator
+        self._step_prompt_prefix: str = (
+            AUTONOMOUS_CODE_REQUIREMENT + _STEP_CODE_PROMPT_TEMPLATE.format(username=get_username())
+        )
+        self._step_code_cache: Dict[bytes, str] = {}
+        self._step_code_lock = threading.Lock()
+        # Diagnoses for the plan being executed, keyed by
+        # (step number, error type, error details digest)
+        self._diagnosis_cache: Dict[Tuple[int, str, bytes], FailureDiagnosis] = {}
+        self._diagnosis_store: Optional[shelve.Shelf] = None
+        if diagnosis_store_path is not None:
+            self._diagnosis_store = _open_diagnosis_store(diagnosis_store_path)
 
         # Initialize metasploit components
         self.metasploit_executor = MetasploitExecutor()
@@ -96,8 +272,7 @@ class DualExecutionOrchestrator:
         if gui_callback:
             self.metasploit_executor.set_output_callback(gui_callback)
 
-        # Start monitoring for session tracking
-        self.execution_monitor.start_monitoring()
+        # The execution monitor starts its thread once a session or listener is tracked
 
         logger.info("DualExecutionOrchestrator initialized with autonomous pentesting")
 
@@ -115,6 +290,18 @@ class DualExecutionOrchestrator:
         if hasattr(self, "execution_monitor"):
             self.execution_monitor.set_gui_callback(value)
 
+    @property
+    def research_handler(self) -> ResearchIntentHandler:
+        """Get the research handler, creating it on first use."""
+        if self._research_handler is None:
+            self._research_handler = ResearchIntentHandler()
+        return self._research_handler
+
+    @research_handler.setter
+    def research_handler(self, value: ResearchIntentHandler) -> None:
+        """Replace the research handler."""
+        self._research_handler = value
+
     def process_request(
         self, user_input: str, max_attempts: Optional[int] = None
     ) -> Generator[str, None, None]:
@@ -150,11 +337,13 @@ class DualExecutionOrchestrator:
         elif mode == ExecutionMode.RESEARCH_AND_ACT:
             logger.info("Using RESEARCH_AND_ACT mode")
             yield from self._execute_research_and_act_mode(
-                user_input, max_attempts=max_attempts
+                user_input, max_attempts=max_attempts, mode=mode
             )
         elif mode == ExecutionMode.DIRECT and confidence >= 0.6:
             logger.info("Using DIRECT execution mode")
-            yield from self._execute_direct_mode(user_input, max_attempts=max_attempts)
+            yield from self._execute_direct_mode(
+                user_input, max_attempts=max_attempts, mode=mode
+            )
         else:
             logger.info("Using PLANNING execution mode")
             yield from self._execute_planning_mode(
@@ -162,9 +351,18 @@ class DualExecutionOrchestrator:
             )
 
     def _execute_direct_mode(
-        self, user_input: str, max_attempts: Optional[int]
+        self,
+        user_input: str,
+        max_attempts: Optional[int],
+        mode: Optional[ExecutionMode] = None,
     ) -> Generator[str, None, None]:
-        """Execute in DIRECT mode (single-step code gen + run, with retries)."""
+        """Execute in DIRECT mode (single-step code gen + run, with retries).
+
+        Args:
+            user_input: User's natural language request
+            max_attempts: Maximum retry attempts. None means unlimited.
+            mode: Mode already computed by the router for user_input, if any
+        """
 
         logger.info("Executing in DIRECT mode")
 
@@ -175,7 +373,7 @@ class DualExecutionOrchestrator:
                 f"Research needed for '{tool_name}', routing to RESEARCH_AND_ACT mode"
             )
             yield from self._execute_research_and_act_mode(
-                user_input, max_attempts=max_attempts
+                user_input, max_attempts=max_attempts, mode=mode
             )
             return
 
@@ -203,9 +401,19 @@ class DualExecutionOrchestrator:
             yield f"\n❌ Research failed: {str(e)}\n"
 
     def _execute_research_and_act_mode(
-        self, user_input: str, max_attempts: Optional[int] = None
+        self,
+        user_input: str,
+        max_attempts: Optional[int] = None,
+        mode: Optional[ExecutionMode] = None,
     ) -> Generator[str, None, None]:
-        """Execute in RESEARCH_AND_ACT mode (research then execute)."""
+        """Execute in RESEARCH_AND_ACT mode (research then execute).
+
+        Args:
+            user_input: User's natural language request
+            max_attempts: Maximum retry attempts. None means unlimited.
+            mode: Mode already computed by the router for user_input. When
+                omitted the request is classified again.
+        """
         logger.info(f"Executing in RESEARCH_AND_ACT mode: {user_input}")
         yield f"🔍 Step 1: Researching {user_input}...\n"
 
@@ -248,8 +456,10 @@ Based on the research above, generate and execute Python code that accomplishes
 Use the actual commands/syntax from the research. Include necessary imports and error handling.
 Save any generated files to the Desktop."""
             # Route based on complexity
-            mode, confidence = self.router.classify(user_input)
-            if mode == ExecutionMode.PLANNING or len(user_input.split()) > 10:
+            if mode is None:
+                mode, _ = self.router.classify(user_input)
+            # maxsplit bounds the work: only whether there are >10 words matters
+            if mode == ExecutionMode.PLANNING or len(user_input.split(None, 10)) > 10:
                 yield from self._execute_planning_mode(
                     augmented_input, max_attempts=max_attempts
                 )
@@ -269,39 +479,82 @@ Save any generated files to the Desktop."""
 
         logger.info("Executing in PLANNING mode")
 
+        codegen_pool: Optional[ThreadPoolExecutor] = None
+        self._diagnosis_cache.clear()
         try:
             # Break down request into steps
             yield "📋 Planning steps...\n"
             steps = self.code_step_breakdown.breakdown_request(user_input)
 
-            yield f"  Created {len(steps)} step(s)\n"
-            for step in steps:
-                yield f"  Step {step.step_number}: {step.description}\n"
-            yield "\n"
+            # Plan summary and the start banner go out as one chunk
+            yield "".join(
+                [
+                    f"  Created {len(steps)} step(s)\n",
+                    *(f"  Step {step.step_number}: {step.description}\n" for step in steps),
+                    "\n▶️ Starting execution...\n\n",
+                ]
+            )
 
             # Execute each step with monitoring and adaptive fixing
-            yield "▶️ Starting execution...\n\n"
 
             completed_steps = 0
-            for step in steps:
+            input_handler = SmartInputHandler()
+
+            # Attempt numbers and their progress labels are the same for every
+            # step; with no limit they are produced lazily per step instead
+            attempt_schedule: Optional[List[Tuple[int, str]]] = None
+            if max_attempts is not None:
+                attempt_schedule = [
+                    (attempt, format_attempt_progress(attempt, max_attempts))
+                    for attempt in range(1, max_attempts + 1)
+                ]
+
+            # Code generation only depends on the step and the request, so the
+            # next code step's code is generated on one worker thread while the
+            # current step runs. Futures are keyed by position in the plan, as
+            # step numbers are not guaranteed unique. LLMClient.generate is safe
+            # to call from several threads.
+            codegen: Dict[int, Future] = {}
+            pending = [index for index, s in enumerate(steps) if s.is_code_execution and not s.code]
+            prefetched = 0  # pending steps submitted so far
+            passed = 0  # pending steps at or before the current step
+            if len(pending) > 1:
+                codegen_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="step-codegen")
+
+            for index, step in enumerate(steps):
+                if codegen_pool is not None:
+                    while passed < len(pending) and pending[passed] <= index:
+                        passed += 1
+                    while prefetched < min(passed + _CODEGEN_LOOKAHEAD, len(pending)):
+                        pending_index = pending[prefetched]
+                        codegen[pending_index] = codegen_pool.submit(
+                            self._generate_step_code, steps[pending_index], user_input
+                        )
+                        prefetched += 1
+
                 step.max_retries = max_attempts
 
-                yield f"▶️ Step {step.step_number}/{len(steps)}: {step.description}\n"
+                step_header = f"▶️ Step {step.step_number}/{len(steps)}: {step.description}\n"
 
                 if not step.is_code_execution:
                     completed_steps += 1
                     step.status = "completed"
-                    yield "   ✓ Informational step (no execution required)\n\n"
+                    yield step_header + "   ✓ Informational step (no execution required)\n\n"
                     continue
 
+                yield step_header
+
                 # Generate code for this step if needed
                 if not step.code:
                     yield "   Generating code...\n"
-                    step.code = self._generate_step_code(step, user_input)
+                    future = codegen.get(index)
+                    if future is not None:
+                        step.code = future.result()
+                    else:
+                        step.code = self._generate_step_code(step, user_input)
                     yield "   ✓ Code generated\n"
 
                 # Apply Smart Input Detection & Injection
-                input_handler = SmartInputHandler()
                 step.code, test_inputs = input_handler.detect_and_inject_inputs(
                     step.code
                 )
@@ -309,28 +562,34 @@ Save any generated files to the Desktop."""
                     yield f"   🧠 Smart Input: Auto-injecting {len(test_inputs)} values\n"
                     step.code = input_handler.inject_test_inputs(step.code, test_inputs)
 
-                attempt = 1
-                while True:
-                    progress = format_attempt_progress(attempt, max_attempts)
+                if attempt_schedule is not None:
+                    attempts: Iterable[Tuple[int, str]] = attempt_schedule
+                else:
+                    attempts = (
+                        (attempt, format_attempt_progress(attempt, None))
+                        for attempt in itertools.count(1)
+                    )
+
+                for attempt, progress in attempts:
                     yield f"   {progress}\n"
 
                     try:
                         error_detected = False
-                        error_output = ""
-                        full_output = ""
+                        error_output_parts: Deque[str] = deque(maxlen=_STEP_ERROR_TAIL_LINES)
+                        output_tail: Deque[str] = deque(maxlen=_STEP_OUTPUT_TAIL_LINES)
 
                         for (
                             line,
                             is_error,
                             error_msg,
                         ) in self.execution_monitor.execute_step(step):
-                            full_output += line
+                            output_tail.append(line)
                             yield f"   {line}"
                             if is_error:
                                 error_detected = True
-                                error_output += line
-                                if not line.endswith("\n"):
-                                    error_output += "\n"
+                                error_output_parts.append(
+                                    line if line.endswith("\n") else line + "\n"
+                                )
 
                         if not error_detected:
                             completed_steps += 1
@@ -338,8 +597,13 @@ Save any generated files to the Desktop."""
                             yield f"   ✓ Step completed successfully on {progress}\n\n"
                             break
 
+                        # Cached code is only reused for steps that ran cleanly
+                        self._forget_step_code(step, user_input)
                         yield f"   ❌ Error detected in step {step.step_number} ({progress})\n"
 
+                        error_output = "".join(error_output_parts)
+                        full_output = "".join(output_tail)
+
                         # Special-case Unicode encoding failures to avoid infinite LLM retry loops.
                         if is_unicode_encoding_error(error_output or full_output):
                             if attempt == 1:
@@ -349,7 +613,6 @@ Save any generated files to the Desktop."""
                                 )
                                 step.code = ensure_utf8_header(step.code or "")
                                 step.status = "retrying"
-                                attempt += 1
                                 continue
 
                             if attempt == 2:
@@ -359,7 +622,6 @@ Save any generated files to the Desktop."""
                                 )
                                 step.code = sanitize_unicode_chars(step.code or "")
                                 step.status = "retrying"
-                                attempt += 1
                                 continue
 
                             step.status = "failed"
@@ -375,14 +637,15 @@ Save any generated files to the Desktop."""
                                 error_output or full_output
                             )
                         )
-                        yield f"   Error type: {error_type}\n"
-                        yield "   Diagnosing failure...\n"
+                        yield f"   Error type: {error_type}\n   Diagnosing failure...\n"
 
-                        diagnosis = self.adaptive_fix_engine.diagnose_failure(
+                        diagnosis = self._diagnose_step_failure(
                             step, error_type, error_details, full_output
                         )
-                        yield f"   Root cause: {diagnosis.root_cause}\n"
-                        yield f"   🔧 Fixing: {diagnosis.suggested_fix}\n"
+                        yield (
+                            f"   Root cause: {diagnosis.root_cause}\n"
+                            f"   🔧 Fixing: {diagnosis.suggested_fix}\n"
+                        )
 
                         # Check if we should abort due to repeated failures
                         if self.adaptive_fix_engine.should_abort_retry(
@@ -398,11 +661,12 @@ Save any generated files to the Desktop."""
                             break
 
                         # For ImportError on external packages, prefer stdlib fallback
+                        fix_notice = ""
                         if (
                             error_type == "ImportError"
                             and diagnosis.fix_strategy == "install_package"
                         ):
-                            yield (
+                            fix_notice = (
                                 "   ⚠️  Import error detected - will try stdlib-only "
                                 "solution instead of external package\n"
                             )
@@ -412,19 +676,19 @@ Save any generated files to the Desktop."""
                                 "Rewrite using only Python standard library"
                             )
 
-                        yield "   Applying fix...\n"
+                        yield fix_notice + "   Applying fix...\n"
                         fixed_code = self.adaptive_fix_engine.generate_fix(
                             step, diagnosis, attempt - 1
                         )
                         step.code = fixed_code
                         step.status = "retrying"
 
-                        attempt += 1
                         yield f"   ▶️ Retrying step {step.step_number}...\n\n"
                         continue
 
                     except Exception as e:
                         logger.error(f"Exception during step execution: {e}")
+                        self._forget_step_code(step, user_input)
 
                         if max_attempts is not None and attempt >= max_attempts:
                             yield f"   ❌ Step failed: {str(e)}\n\n"
@@ -432,9 +696,12 @@ Save any generated files to the Desktop."""
                             break
 
                         yield f"   ❌ Exception on {progress}: {str(e)}\n"
-                        attempt += 1
                         yield "   ▶️ Retrying...\n\n"
                         continue
+                else:
+                    # Every scheduled attempt was used without success
+                    step.status = "failed"
+                    yield f"   ❌ Step failed after {max_attempts} attempt(s)\n\n"
 
                 # If step failed and it has dependencies, abort
                 if step.status == "failed":
@@ -442,12 +709,90 @@ Save any generated files to the Desktop."""
                     break
 
             # Final summary
-            yield "\n✅ Execution complete\n"
-            yield f"   Completed: {completed_steps}/{len(steps)} steps\n"
+            yield f"\n✅ Execution complete\n   Completed: {completed_steps}/{len(steps)} steps\n"
 
         except Exception as e:
             logger.error(f"PLANNING mode execution failed: {e}")
             yield f"\n❌ Error: {str(e)}\n"
+        finally:
+            if codegen_pool is not None:
+                codegen_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _diagnose_step_failure(
+        self, step: CodeStep, error_type: str, error_details: str, full_output: str
+    ) -> FailureDiagnosis:
+        """
+        Diagnose a step failure, reusing the diagnosis of an identical earlier error.
+
+        Retries of a step often fail with exactly the same error; those reuse
+        the cached diagnosis instead of asking the fix engine again.
+
+        Args:
+            step: Step that failed
+            error_type: Parsed error type
+            error_details: Parsed error details
+            full_output: Output of the failed run
+
+        Returns:
+            FailureDiagnosis for the error (a copy, safe for the caller to modify)
+        """
+        key = (
+            step.step_number,
+            error_type,
+            hashlib.blake2b(error_details.encode("utf-8"), digest_size=8).digest(),
+        )
+        diagnosis = self._diagnosis_cache.get(key)
+        if diagnosis is None:
+            store_key = None
+            if self._diagnosis_store is not None:
+                store_key = hashlib.blake2b(
+                    "|".join(
+                        (
+                            step.description,
+                            step.code or "",
+                            error_type,
+                            error_details[:_DIAGNOSIS_KEY_DETAIL_CHARS],
+                        )
+                    ).encode("utf-8"),
+                    digest_size=16,
+                ).hexdigest()
+                diagnosis = self._load_stored_diagnosis(store_key)
+
+            if diagnosis is None:
+                diagnosis = self.adaptive_fix_engine.diagnose_failure(
+                    step, error_type, error_details, full_output
+                )
+                if (
+                    store_key is not None
+                    and diagnosis.confidence >= _DIAGNOSIS_MIN_STORED_CONFIDENCE
+                ):
+                    self._store_diagnosis(store_key, diagnosis)
+            self._diagnosis_cache[key] = diagnosis
+        else:
+            logger.debug(f"Reusing diagnosis for step {step.step_number}: {error_type}")
+        return diagnosis.model_copy()
+
+    def _load_stored_diagnosis(self, store_key: str) -> Optional[FailureDiagnosis]:
+        """Load a persisted diagnosis, or None if absent or unreadable."""
+        store = self._diagnosis_store
+        if store is None:
+            return None
+        try:
+            data = store.get(store_key)
+            return FailureDiagnosis(**data) if data is not None else None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable stored diagnosis: {e}")
+            return None
+
+    def _store_diagnosis(self, store_key: str, diagnosis: FailureDiagnosis) -> None:
+        """Persist a diagnosis; failures only cost the warm start."""
+        store = self._diagnosis_store
+        if store is None:
+            return
+        try:
+            store[store_key] = diagnosis.model_dump()
+        except Exception as e:
+            logger.warning(f"Could not persist diagnosis: {e}")
 
     def _generate_step_code(self, step: CodeStep, user_input: str) -> str:
         """
@@ -460,105 +805,50 @@ Save any generated files to the Desktop."""
         Returns:
             Generated code
         """
-        import getpass
-
-        username = getpass.getuser()
-
-        prompt = f"""{AUTONOMOUS_CODE_REQUIREMENT}
-
-═══════════════════════════════════════════════════════════════════════════════
-🔓 MULTI-STEP CODE GENERATION - FULL SYSTEM ACCESS
-═══════════════════════════════════════════════════════════════════════════════
-
-Original Request: {user_input}
-
-Current Step: {step.description}
-Step Number: {step.step_number}
-
-You have FULL SYSTEM ACCESS. Generate COMPLETE, WORKING code for this specific step.
-
-═══════════════════════════════════════════════════════════════════════════════
-📋 REQUIREMENTS
-═══════════════════════════════════════════════════════════════════════════════
-
-1. COMPLETENESS:
-   - Write FULL implementation for THIS step only
-   - Include ALL necessary imports
-   - Make it immediately executable
-   - No TODO comments or placeholders
-
-2. FULL ACCESS CAPABILITIES:
-   - Read/write files anywhere: C:\\Users\\{username}\\
-   - Network operations with raw sockets
-   - System commands via subprocess
-   - Any pip packages (auto-installed)
-   - Desktop output: C:\\Users\\{username}\\Desktop
-
-3. ERROR HANDLING:
-   - Wrap risky operations in try/except
-   - Add timeouts for I/O operations:
-     * socket.settimeout(30)
-     * requests.get(url, timeout=10)
-     * thread.join(timeout=30)
-   - Log errors clearly
-
-4. AUTONOMY:
-   - Hard-code ALL test values
-   - NO input() calls
-   - No user interaction required
-   - Print progress messages
-
-5. ENCODING (WINDOWS SAFETY):
-   - Avoid Unicode-only math symbols in code/UI strings (e.g., √, ±, ∞). Prefer ASCII like "sqrt", "+/-", "inf".
-   - If non-ASCII is truly required, include a UTF-8 coding cookie at the top: # -*- coding: utf-8 -*-
-
-6. WINDOWS PATHS:
-   - Use pathlib.Path or os.path
-   - Home: C:\\Users\\{username}
-   - Desktop: C:\\Users\\{username}\\Desktop
-   - Temp: C:\\Users\\{username}\\AppData\\Local\\Temp
-   - Use raw strings: r'C:\\path' or Path()
-
-═══════════════════════════════════════════════════════════════════════════════
-🔍 VERIFICATION CHECKLIST (Before returning code)
-═══════════════════════════════════════════════════════════════════════════════
-
-✓ All imports correct and available
-✓ No infinite loops (all loops have exit conditions)
-✓ Timeouts on I/O operations (sockets, requests, threads)
-✓ Proper error handling (try/except blocks)
-✓ No input() calls or interactive prompts
-✓ Windows paths used correctly
-✓ Code is complete and immediately runnable
-
-═══════════════════════════════════════════════════════════════════════════════
-📤 OUTPUT FORMAT
-═══════════════════════════════════════════════════════════════════════════════
-
-Return ONLY valid Python code in a single code block:
-
-```python
-# Complete, working code for this step
-```
-
-Rules:
-- ONE ```python ... ``` block only
-- No explanations outside code
-- No markdown text before/after
-- Code must work on first execution"""
+        prompt = self._step_code_prompt(step, user_input)
+        key = self._step_code_key(prompt)
+        with self._step_code_lock:
+            cached = self._step_code_cache.get(key)
+        if cached is not None:
+            logger.debug(f"Reusing generated code for step {step.step_number}")
+            return cached
 
         try:
             raw_code = self.llm_client.generate(prompt)
             code = clean_code(str(raw_code))
-            code = ensure_utf8_header(code)
+            code = str(ensure_utf8_header(code))
             logger.debug(
                 f"Generated code for step {step.step_number}: {len(code)} characters"
             )
-            return str(code)
+            with self._step_code_lock:
+                if len(self._step_code_cache) >= _STEP_CODE_CACHE_SIZE:
+                    # Evict the oldest entry (dicts keep insertion order)
+                    del self._step_code_cache[next(iter(self._step_code_cache))]
+                self._step_code_cache[key] = code
+            return code
         except Exception as e:
             logger.error(f"Failed to generate code for step {step.step_number}: {e}")
             raise
 
+    def _step_code_prompt(self, step: CodeStep, user_input: str) -> str:
+        """Build the code generation prompt for a step."""
+        return self._step_prompt_prefix + _STEP_CODE_TASK_TEMPLATE.format(
+            user_input=user_input,
+            step_description=step.description,
+            step_number=step.step_number,
+        )
+
+    @staticmethod
+    def _step_code_key(prompt: str) -> bytes:
+        """Key a step code cache entry by its prompt digest."""
+        return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).digest()
+
+    def _forget_step_code(self, step: CodeStep, user_input: str) -> None:
+        """Drop a step's cached code so the next request regenerates it."""
+        key = self._step_code_key(self._step_code_prompt(step, user_input))
+        with self._step_code_lock:
+            self._step_code_cache.pop(key, None)
+
     def get_execution_mode(self, user_input: str) -> ExecutionMode:
         """
         Get the execution mode for a user request.
@@ -569,8 +859,9 @@ Rules:
         Returns:
             ExecutionMode (DIRECT or PLANNING)
         """
+        # classify() always returns an ExecutionMode member; no conversion needed
         mode, _ = self.router.classify(user_input)
-        return ExecutionMode(mode)
+        return mode
 
     def _execute_pentesting_mode(self, user_input: str) -> Generator[str, None, None]:
         """Execute pentesting request using autonomous pentesting assistant."""
@@ -6,10 +6,72 @@ clarification before execution.
 """
 
 import logging
-from typing import Tuple
+import re
+from typing import Iterable, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Patterns that require authorization check
+_AUTHORIZATION_PATTERNS = {
+    "steal": "Requires authorization - are you authorized to access these credentials?",
+    "hack": "Requires authorization - do you have permission to access this system?",
+    "crack": "Requires authorization - do you own or have permission to access this?",
+    "bypass": "Requires authorization - are you authorized to bypass this security?",
+    "exploit": "Requires authorization - do you have permission to test this system?",
+}
+
+# Patterns that suggest malicious intent (needs purpose clarification)
+_MALICIOUS_PATTERNS = {
+    "malware": "Requires clarification - what is the legitimate purpose for this?",
+    "backdoor": "Requires clarification - what is the authorized use case?",
+    "keylogger": "Requires clarification - do you have authorization for this monitoring?",
+    "ransomware": "Refusing - this appears to be illegal activity",
+    "botnet": "Refusing - this appears to be illegal activity",
+}
+
+# Patterns for impossible requests
+_IMPOSSIBLE_PATTERNS = {
+    "hack someone else": "Refusing - unauthorized access is illegal",
+    "hack the pentagon": "Refusing - unauthorized access is illegal",
+    "hack the government": "Refusing - unauthorized access is illegal",
+    "someone else's computer": "Refusing - unauthorized access is illegal",
+    "someone else's": "Refusing - unauthorized access is illegal",
+    "impossible physics": "Refusing - this violates physical laws",
+    # Catch "impossible physics code"
+    "physics code": "Refusing - this may violate physical laws",
+    "violate conservation": "Refusing - violates physics laws",
+    "violate thermodynamics": "Refusing - violates physics laws",
+    "predict the future": "Refusing - this is scientifically impossible",
+    "perpetual motion": "Refusing - this violates thermodynamics",
+}
+
+# Error/request text that marks a failure as not worth retrying
+_REFUSAL_INDICATORS = (
+    "illegal",
+    "unauthorized",
+    "permission denied",
+    "access denied",
+    "violates",
+    "impossible",
+)
+
+
+def _alternation(*pattern_groups: Iterable[str]) -> str:
+    """Join literal patterns into a single regex alternation, in order."""
+    return "|".join(re.escape(pattern) for patterns in pattern_groups for pattern in patterns)
+
+
+# One alternation over every pattern so safe requests (the common case) are
+# cleared with a single scan instead of one substring test per pattern.
+_PATTERN_RE = re.compile(
+    _alternation(_IMPOSSIBLE_PATTERNS, _AUTHORIZATION_PATTERNS, _MALICIOUS_PATTERNS)
+)
+# Impossible patterns and refusal indicators share one alternation, so
+# is_unfixable needs a single scan per string. Inputs are lowercased rather
+# than matched with re.IGNORECASE, which disables the literal-prefix search
+# and is several times slower.
+_UNFIXABLE_RE = re.compile(_alternation(_IMPOSSIBLE_PATTERNS, _REFUSAL_INDICATORS))
+
 
 class EthicalChecker:
     """
@@ -22,42 +84,12 @@ class EthicalChecker:
     - Impossible or unfixable requests
     """
 
+    authorization_patterns = _AUTHORIZATION_PATTERNS
+    malicious_patterns = _MALICIOUS_PATTERNS
+    impossible_patterns = _IMPOSSIBLE_PATTERNS
+
     def __init__(self):
         """Initialize the ethical checker."""
-        # Patterns that require authorization check
-        self.authorization_patterns = {
-            "steal": "Requires authorization - are you authorized to access these credentials?",
-            "hack": "Requires authorization - do you have permission to access this system?",
-            "crack": "Requires authorization - do you own or have permission to access this?",
-            "bypass": "Requires authorization - are you authorized to bypass this security?",
-            "exploit": "Requires authorization - do you have permission to test this system?",
-        }
-
-        # Patterns that suggest malicious intent (needs purpose clarification)
-        self.malicious_patterns = {
-            "malware": "Requires clarification - what is the legitimate purpose for this?",
-            "backdoor": "Requires clarification - what is the authorized use case?",
-            "keylogger": "Requires clarification - do you have authorization for this monitoring?",
-            "ransomware": "Refusing - this appears to be illegal activity",
-            "botnet": "Refusing - this appears to be illegal activity",
-        }
-
-        # Patterns for impossible requests
-        self.impossible_patterns = {
-            "hack someone else": "Refusing - unauthorized access is illegal",
-            "hack the pentagon": "Refusing - unauthorized access is illegal",
-            "hack the government": "Refusing - unauthorized access is illegal",
-            "someone else's computer": "Refusing - unauthorized access is illegal",
-            "someone else's": "Refusing - unauthorized access is illegal",
-            "impossible physics": "Refusing - this violates physical laws",
-            # Catch "impossible physics code"
-            "physics code": "Refusing - this may violate physical laws",
-            "violate conservation": "Refusing - violates physics laws",
-            "violate thermodynamics": "Refusing - violates physics laws",
-            "predict the future": "Refusing - this is scientifically impossible",
-            "perpetual motion": "Refusing - this violates thermodynamics",
-        }
-
         logger.info("EthicalChecker initialized")
 
     def check(self, user_input: str) -> Tuple[bool, str, str]:
@@ -75,6 +107,10 @@ class EthicalChecker:
         """
         input_lower = user_input.lower()
 
+        if not _PATTERN_RE.search(input_lower):
+            logger.debug("Request passed ethical checks")
+            return True, "OK", "safe"
+
         # Check for impossible/unfixable requests first
         for pattern, reason in self.impossible_patterns.items():
             if pattern in input_lower:
@@ -108,21 +144,7 @@ class EthicalChecker:
         Returns:
             True if unfixable (should refuse), False if potentially fixable
         """
-        combined = f"{request} {error}".lower()
-
-        # Check impossible patterns
-        for pattern in self.impossible_patterns.keys():
-            if pattern in combined:
-                return True
-
-        # Check for explicit refusals that shouldn't be retried
-        refusal_indicators = [
-            "illegal",
-            "unauthorized",
-            "permission denied",
-            "access denied",
-            "violates",
-            "impossible",
-        ]
-
-        return any(indicator in combined for indicator in refusal_indicators)
+        # Impossible patterns and explicit refusals shouldn't be retried
+        return bool(
+            _UNFIXABLE_RE.search(request.lower()) or (error and _UNFIXABLE_RE.search(error.lower()))
+        )
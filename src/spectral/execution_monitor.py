@@ -9,17 +9,102 @@ Monitors:
 - Real-time status updates
 """
 
+import heapq
+import itertools
 import logging
+import queue
+import sys
 import threading
 import time
-from dataclasses import dataclass, field
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
 from enum import Enum
-from typing import Callable, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Deque, Dict, Iterator, List, Mapping, Optional, Tuple
 
 from spectral.metasploit_executor import ListenerInfo, SessionInfo
 
 logger = logging.getLogger(__name__)
 
+# Most recent execution events kept; older events are discarded
+_HISTORY_MAXLEN = 10_000
+
+# Session inactivity thresholds (seconds): ACTIVE -> IDLE, then IDLE -> closed
+_IDLE_AFTER_S = 300
+_CLOSE_IDLE_AFTER_S = 1800
+
+# Monitor wake-up cadence (seconds): status updates while callbacks are
+# registered, otherwise a backstop between session deadlines
+_STATUS_INTERVAL_S = 1.0
+_MONITOR_BACKSTOP_S = 60.0
+
+# Pending callback dispatches; further events are dropped while the queue is full
+_CALLBACK_QUEUE_MAX = 1024
+
+# Deadline heaps are rebuilt once they exceed this many entries per session (+ slack)
+_DEADLINE_COMPACT_FACTOR = 4
+_DEADLINE_COMPACT_SLACK = 64
+
+# Slotted records where supported (3.10+); history can hold many events
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+class _RWLock:
+    """
+    Reader-writer lock: any number of readers or a single writer.
+
+    The writer side is reentrant, and a thread holding the write lock may also
+    take the read lock. Readers are preferred, which suits the monitor where
+    status reads far outnumber state changes.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+
+    @contextmanager
+    def gen_rlock(self) -> Iterator[None]:
+        """Hold the lock for reading."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                counted = False
+            else:
+                while self._writer is not None:
+                    self._cond.wait()
+                self._readers += 1
+                counted = True
+        try:
+            yield
+        finally:
+            if counted:
+                with self._cond:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def gen_wlock(self) -> Iterator[None]:
+        """Hold the lock for writing."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+                self._writer = me
+            self._writer_depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer_depth -= 1
+                if not self._writer_depth:
+                    self._writer = None
+                    self._cond.notify_all()
+
 
 class SessionState(Enum):
     """States of a metasploit session."""
@@ -40,7 +125,12 @@ class ListenerState(Enum):
     STOPPED = "stopped"
 
 
-@dataclass
+# Enum .value goes through a descriptor; status snapshots look the strings up instead
+_SESSION_STATE_STR = {state: sys.intern(state.value) for state in SessionState}
+_LISTENER_STATE_STR = {state: sys.intern(state.value) for state in ListenerState}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class TrackedSession:
     """Tracked metasploit session with state and metadata."""
 
@@ -52,9 +142,17 @@ class TrackedSession:
     success_count: int = 0
     error_count: int = 0
     metadata: Dict[str, str] = field(default_factory=dict)
+    # Status-update fields that never change for the session's lifetime
+    _status_view: Dict[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._status_view = {
+            "type": self.session_info.session_type,
+            "target": self.session_info.target_ip,
+        }
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class TrackedListener:
     """Tracked metasploit listener with state and metadata."""
 
@@ -63,9 +161,17 @@ class TrackedListener:
     created_at: float = field(default_factory=time.time)
     connection_count: int = 0
     metadata: Dict[str, str] = field(default_factory=dict)
+    # Status-update fields that never change for the listener's lifetime
+    _status_view: Dict[str, str] = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        self._status_view = {
+            "payload": self.listener_info.payload,
+            "endpoint": f"{self.listener_info.lhost}:{self.listener_info.lport}",
+        }
 
-@dataclass
+
+@dataclass(**_DATACLASS_SLOTS)
 class ExecutionEvent:
     """Event in the execution history."""
 
@@ -91,14 +197,39 @@ class ExecutionMonitor:
         """Initialize the execution monitor."""
         self.active_sessions: Dict[str, TrackedSession] = {}
         self.active_listeners: Dict[str, TrackedListener] = {}
-        self.execution_history: List[ExecutionEvent] = []
-        self.status_callbacks: List[Callable[[str, Dict], None]] = []
+        # Read-only views republished on every add/remove so getters skip the lock
+        self._sessions_snapshot: Mapping[str, TrackedSession] = MappingProxyType({})
+        self._listeners_snapshot: Mapping[str, TrackedListener] = MappingProxyType({})
+        # Running totals over active records, kept in step with every mutation
+        self._totals: Dict[str, int] = {"commands": 0, "success": 0, "errors": 0}
+        self._listener_connections_total = 0
+        # Min-heaps of (deadline, session_id) for ACTIVE -> IDLE and IDLE -> closed.
+        # Entries are never removed early; stale ones are skipped when popped.
+        self._idle_deadlines: List[Tuple[float, str]] = []
+        self._close_deadlines: List[Tuple[float, str]] = []
+        self.execution_history: Deque[ExecutionEvent] = deque(maxlen=_HISTORY_MAXLEN)
+        # Republished as a new tuple on every change, so firing needs no lock or copy
+        self.status_callbacks: Tuple[Callable[[str, Dict], None], ...] = ()
         self.gui_callback: Optional[Callable[[str, dict], None]] = None
 
         # Threading
         self._monitoring = False
-        self._monitor_thread = None
-        self._lock = threading.RLock()
+        self._monitor_thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Condition()
+        self._wake_pending = False
+        # Set on every tracked change; the loop only emits status when set
+        self._dirty = False
+        # Sessions and listeners never change together, so each has its own lock
+        self._sessions_lock = _RWLock()
+        self._listeners_lock = _RWLock()
+        # Serializes callback registration only; never re-entered
+        self._callbacks_lock = threading.Lock()
+        # Callbacks run in order on a single worker so a slow one cannot stall tracking
+        self._callback_queue: "queue.Queue[Optional[tuple]]" = queue.Queue(
+            maxsize=_CALLBACK_QUEUE_MAX
+        )
+        self._callback_thread: Optional[threading.Thread] = None
+        self._dropped_callbacks = 0
 
         logger.info("ExecutionMonitor initialized")
 
@@ -109,8 +240,10 @@ class ExecutionMonitor:
         Args:
             callback: Function to call with status updates
         """
-        with self._lock:
-            self.status_callbacks.append(callback)
+        with self._callbacks_lock:
+            self.status_callbacks = self.status_callbacks + (callback,)
+        # Give the new subscriber a snapshot on the next tick
+        self._dirty = True
 
     def remove_status_callback(self, callback: Callable[[str, Dict], None]) -> None:
         """
@@ -119,9 +252,11 @@ class ExecutionMonitor:
         Args:
             callback: Callback to remove
         """
-        with self._lock:
+        with self._callbacks_lock:
             if callback in self.status_callbacks:
-                self.status_callbacks.remove(callback)
+                callbacks = list(self.status_callbacks)
+                callbacks.remove(callback)
+                self.status_callbacks = tuple(callbacks)
 
     def set_gui_callback(self, callback: Optional[Callable[[str, dict], None]]) -> None:
         """
@@ -138,103 +273,233 @@ class ExecutionMonitor:
             try:
                 self.gui_callback(event_type, data)
             except Exception as e:
-                logger.debug(f"GUI callback error: {e}")
+                logger.debug("GUI callback error: %s", e)
 
     def start_monitoring(self) -> None:
-        """Start the monitoring thread."""
-        if self._monitoring:
-            return
+        """
+        Start the monitoring thread.
 
-        self._monitoring = True
-        self._monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
-        self._monitor_thread.start()
+        Tracking a session or listener starts it automatically, so explicit
+        calls are only needed to monitor before anything is tracked.
+        """
+        with self._wakeup:
+            if self._monitoring:
+                return
+
+            self._monitoring = True
+            self._monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
+            self._monitor_thread.start()
 
         logger.info("Execution monitoring started")
 
     def stop_monitoring(self) -> None:
         """Stop the monitoring thread."""
-        self._monitoring = False
-        if self._monitor_thread:
-            self._monitor_thread.join(timeout=2.0)
+        thread = self._signal_monitor_stop()
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
 
         logger.info("Execution monitoring stopped")
 
+    def _signal_monitor_stop(self) -> Optional[threading.Thread]:
+        """Tell the monitor thread to exit without waiting; returns the thread."""
+        with self._wakeup:
+            self._monitoring = False
+            thread, self._monitor_thread = self._monitor_thread, None
+            self._wakeup.notify_all()
+        return thread
+
+    def _stop_monitoring_if_idle(self) -> None:
+        """Let the monitor thread exit once nothing is tracked."""
+        # Checked under the wake-up lock: a concurrent track_* inserts before it
+        # calls start_monitoring, so it either sees this stop or keeps us running
+        with self._wakeup:
+            if not self._monitoring or self.active_sessions or self.active_listeners:
+                return
+            self._signal_monitor_stop()
+
+        logger.info("Execution monitoring stopped (nothing tracked)")
+
     def _monitor_loop(self) -> None:
         """Main monitoring loop."""
-        while self._monitoring:
+        # A restart may begin before this thread exits, so only the current
+        # monitor thread keeps looping
+        me = threading.current_thread()
+        while self._monitoring and self._monitor_thread is me:
             try:
                 self._update_session_states()
                 self._check_for_inactive_sessions()
-                self._emit_status_update()
-                time.sleep(1.0)  # Check every second
+                self._flush_status_update()
+
+                # Sleep until the next session deadline or status tick, or
+                # until a tracked change wakes the loop early
+                timeout = self._next_wait_timeout()
+                with self._wakeup:
+                    self._wakeup.wait_for(
+                        lambda: self._wake_pending or self._monitor_thread is not me, timeout
+                    )
+                    self._wake_pending = False
             except Exception as e:
-                logger.error(f"Error in monitoring loop: {e}")
+                logger.error("Error in monitoring loop: %s", e)
                 time.sleep(5.0)  # Wait longer on error
 
+    def _wake_monitor(self) -> None:
+        """Wake the monitor loop to process a state change."""
+        with self._wakeup:
+            self._wake_pending = True
+            self._wakeup.notify()
+
+    def _next_wait_timeout(self) -> float:
+        """Seconds the monitor loop may sleep before it has work to do."""
+        timeout = _STATUS_INTERVAL_S if self.status_callbacks else _MONITOR_BACKSTOP_S
+        now = time.time()
+
+        with self._sessions_lock.gen_rlock():
+            # Stale heap entries can only make the wait shorter, never longer
+            for deadlines in (self._idle_deadlines, self._close_deadlines):
+                if deadlines:
+                    timeout = min(timeout, deadlines[0][0] - now)
+
+        return max(timeout, 0.0)
+
+    def _schedule_deadline(self, session_id: str, tracked_session: TrackedSession) -> None:
+        """
+        Queue the next inactivity deadline for a session.
+
+        Must be called with the sessions write lock held, after any change to the
+        session's state or last activity.
+
+        Args:
+            session_id: ID of the session
+            tracked_session: The session's current record
+        """
+        if tracked_session.state == SessionState.ACTIVE:
+            heapq.heappush(
+                self._idle_deadlines, (tracked_session.last_activity + _IDLE_AFTER_S, session_id)
+            )
+        elif tracked_session.state == SessionState.IDLE:
+            heapq.heappush(
+                self._close_deadlines,
+                (tracked_session.last_activity + _CLOSE_IDLE_AFTER_S, session_id),
+            )
+
+        # Busy sessions leave a stale entry per command; rebuild once they dominate
+        stale_limit = _DEADLINE_COMPACT_FACTOR * len(self.active_sessions) + _DEADLINE_COMPACT_SLACK
+        if len(self._idle_deadlines) + len(self._close_deadlines) > stale_limit:
+            self._rebuild_deadlines()
+
+    def _rebuild_deadlines(self) -> None:
+        """Rebuild both deadline heaps from current sessions; sessions write lock held."""
+        self._idle_deadlines = [
+            (ts.last_activity + _IDLE_AFTER_S, sid)
+            for sid, ts in self.active_sessions.items()
+            if ts.state == SessionState.ACTIVE
+        ]
+        self._close_deadlines = [
+            (ts.last_activity + _CLOSE_IDLE_AFTER_S, sid)
+            for sid, ts in self.active_sessions.items()
+            if ts.state == SessionState.IDLE
+        ]
+        heapq.heapify(self._idle_deadlines)
+        heapq.heapify(self._close_deadlines)
+
+    def _pop_due_sessions(
+        self,
+        deadlines: List[Tuple[float, str]],
+        state: SessionState,
+        threshold: float,
+        now: float,
+    ) -> Iterator[Tuple[str, TrackedSession]]:
+        """
+        Pop due deadlines, yielding sessions whose entry is still current.
+
+        An entry is current if the session is still in ``state`` and its last
+        activity has not moved since the entry was pushed. Must be called with
+        the sessions write lock held.
+        """
+        while deadlines and deadlines[0][0] <= now:
+            deadline, session_id = heapq.heappop(deadlines)
+            tracked_session = self.active_sessions.get(session_id)
+            if (
+                tracked_session is not None
+                and tracked_session.state == state
+                and tracked_session.last_activity + threshold == deadline
+            ):
+                yield session_id, tracked_session
+
     def _update_session_states(self) -> None:
-        """Update states of active sessions."""
+        """Mark sessions idle once their inactivity deadline has passed."""
         current_time = time.time()
 
-        with self._lock:
-            for session_id, tracked_session in self.active_sessions.items():
-                # Update last activity
-                if tracked_session.state == SessionState.ACTIVE:
-                    # Check if session is still responsive (simplified check)
-                    # In real implementation, would ping the session
-                    if current_time - tracked_session.last_activity > 300:  # 5 minutes
-                        tracked_session.state = SessionState.IDLE
+        with self._sessions_lock.gen_wlock():
+            # Check if session is still responsive (simplified check)
+            # In real implementation, would ping the session
+            for session_id, tracked_session in self._pop_due_sessions(
+                self._idle_deadlines, SessionState.ACTIVE, _IDLE_AFTER_S, current_time
+            ):
+                tracked_session.state = SessionState.IDLE
+                self._schedule_deadline(session_id, tracked_session)
+                self._dirty = True
 
     def _check_for_inactive_sessions(self) -> None:
         """Check for sessions that should be marked as closed."""
         current_time = time.time()
 
-        with self._lock:
-            sessions_to_close = []
-
-            for session_id, tracked_session in self.active_sessions.items():
-                # Close sessions that have been idle for too long
-                if (
-                    tracked_session.state == SessionState.IDLE
-                    and current_time - tracked_session.last_activity > 1800
-                ):  # 30 minutes
-                    sessions_to_close.append(session_id)
-
-            # Close the identified sessions
-            for session_id in sessions_to_close:
-                self._close_session(session_id, reason="timeout")
+        with self._sessions_lock.gen_wlock():
+            # Close sessions that have been idle for too long
+            sessions_to_close = [
+                session_id
+                for session_id, _ in self._pop_due_sessions(
+                    self._close_deadlines, SessionState.IDLE, _CLOSE_IDLE_AFTER_S, current_time
+                )
+            ]
+
+        # Close the identified sessions; each close takes the lock itself
+        for session_id in sessions_to_close:
+            self.track_session_closed(session_id, reason="timeout")
+
+    def _flush_status_update(self) -> None:
+        """Emit a status update only if tracked state changed since the last one."""
+        if not self._dirty:
+            return
+        # Clear before building so changes made meanwhile trigger the next flush
+        self._dirty = False
+        self._emit_status_update()
 
     def _emit_status_update(self) -> None:
         """Emit status update to all callbacks."""
-        with self._lock:
-            status_data = {
-                "active_sessions": len(self.active_sessions),
-                "active_listeners": len(self.active_listeners),
-                "sessions": {
-                    sid: {
-                        "type": ts.session_info.session_type,
-                        "target": ts.session_info.target_ip,
-                        "state": ts.state.value,
-                        "age": time.time() - ts.created_at,
-                    }
-                    for sid, ts in self.active_sessions.items()
-                },
-                "listeners": {
-                    lid: {
-                        "payload": tl.listener_info.payload,
-                        "endpoint": f"{tl.listener_info.lhost}:{tl.listener_info.lport}",
-                        "state": tl.state.value,
-                        "connections": tl.connection_count,
-                    }
-                    for lid, tl in self.active_listeners.items()
-                },
+        if not self.status_callbacks:
+            return
+        now = time.time()
+
+        with self._sessions_lock.gen_rlock():
+            sessions = {
+                sid: {
+                    **ts._status_view,
+                    "state": _SESSION_STATE_STR[ts.state],
+                    "age": now - ts.created_at,
+                }
+                for sid, ts in self.active_sessions.items()
             }
 
+        with self._listeners_lock.gen_rlock():
+            listeners = {
+                lid: {
+                    **tl._status_view,
+                    "state": _LISTENER_STATE_STR[tl.state],
+                    "connections": tl.connection_count,
+                }
+                for lid, tl in self.active_listeners.items()
+            }
+
+        status_data = {
+            "active_sessions": len(sessions),
+            "active_listeners": len(listeners),
+            "sessions": sessions,
+            "listeners": listeners,
+        }
+
         # Emit to callbacks
-        for callback in self.status_callbacks:
-            try:
-                callback("status_update", status_data)
-            except Exception as e:
-                logger.error(f"Error in status callback: {e}")
+        self._dispatch_callbacks("status_update", status_data)
 
     def track_session_created(self, session_info: SessionInfo) -> str:
         """
@@ -247,31 +512,37 @@ class ExecutionMonitor:
             Session ID
         """
         session_id = session_info.session_id
-
-        with self._lock:
-            tracked_session = TrackedSession(session_info=session_info)
+        tracked_session = TrackedSession(session_info=session_info)
+        event = ExecutionEvent(
+            timestamp=time.time(),
+            event_type="session_created",
+            event_data={
+                "session_id": session_id,
+                "session_type": session_info.session_type,
+                "target_ip": session_info.target_ip,
+            },
+            description=f"Session {session_id} created ({session_info.session_type})",
+        )
+
+        with self._sessions_lock.gen_wlock():
+            replaced = self.active_sessions.get(session_id)
             self.active_sessions[session_id] = tracked_session
-
-            # Add to history
-            event = ExecutionEvent(
-                timestamp=time.time(),
-                event_type="session_created",
-                event_data={
-                    "session_id": session_id,
-                    "session_type": session_info.session_type,
-                    "target_ip": session_info.target_ip,
-                },
-                description=f"Session {session_id} created ({session_info.session_type})",
-            )
-            self.execution_history.append(event)
-
-            # Emit callback
-            self._emit_event_callback(
-                "session_created",
-                {"session_id": session_id, "session_info": session_info.__dict__},
-            )
-
-        logger.info(f"Tracking session {session_id} ({session_info.session_type})")
+            self._sessions_snapshot = MappingProxyType(dict(self.active_sessions))
+            self._dirty = True
+            # Re-tracking an ID drops the old record; keep the totals in step
+            if replaced is not None:
+                self._totals["commands"] -= replaced.command_count
+                self._totals["success"] -= replaced.success_count
+                self._totals["errors"] -= replaced.error_count
+
+        self._record_event(event)
+        self._emit_event_callback(
+            "session_created",
+            {"session_id": session_id, "session_info": asdict(session_info)},
+        )
+        self.start_monitoring()
+        self._wake_monitor()
+        logger.info("Tracking session %s (%s)", session_id, session_info.session_type)
         return session_id
 
     def track_session_closed(self, session_id: str, reason: str = "unknown") -> bool:
@@ -285,36 +556,36 @@ class ExecutionMonitor:
         Returns:
             True if session was tracked and closed
         """
-        with self._lock:
-            if session_id not in self.active_sessions:
+        with self._sessions_lock.gen_wlock():
+            tracked_session = self.active_sessions.pop(session_id, None)
+            if tracked_session is None:
                 return False
-
-            tracked_session = self.active_sessions[session_id]
             tracked_session.state = SessionState.CLOSED
-
-            # Add to history
-            event = ExecutionEvent(
-                timestamp=time.time(),
-                event_type="session_closed",
-                event_data={
-                    "session_id": session_id,
-                    "reason": reason,
-                    "lifetime": time.time() - tracked_session.created_at,
-                    "command_count": tracked_session.command_count,
-                },
-                description=f"Session {session_id} closed ({reason})",
-            )
-            self.execution_history.append(event)
-
-            # Remove from active sessions
-            del self.active_sessions[session_id]
-
-            # Emit callback
-            self._emit_event_callback(
-                "session_closed", {"session_id": session_id, "reason": reason}
-            )
-
-        logger.info(f"Closed tracking for session {session_id}")
+            self._sessions_snapshot = MappingProxyType(dict(self.active_sessions))
+            self._dirty = True
+            self._totals["commands"] -= tracked_session.command_count
+            self._totals["success"] -= tracked_session.success_count
+            self._totals["errors"] -= tracked_session.error_count
+
+        # The session is no longer shared, so the event is built unlocked
+        now = time.time()
+        event = ExecutionEvent(
+            timestamp=now,
+            event_type="session_closed",
+            event_data={
+                "session_id": session_id,
+                "reason": reason,
+                "lifetime": now - tracked_session.created_at,
+                "command_count": tracked_session.command_count,
+            },
+            description=f"Session {session_id} closed ({reason})",
+        )
+
+        self._record_event(event)
+        self._emit_event_callback("session_closed", {"session_id": session_id, "reason": reason})
+        self._wake_monitor()
+        self._stop_monitoring_if_idle()
+        logger.info("Closed tracking for session %s", session_id)
         return True
 
     def track_listener_started(self, listener_info: ListenerInfo) -> str:
@@ -328,31 +599,34 @@ class ExecutionMonitor:
             Listener ID
         """
         listener_id = listener_info.handler_id
-
-        with self._lock:
-            tracked_listener = TrackedListener(listener_info=listener_info)
+        tracked_listener = TrackedListener(listener_info=listener_info)
+        event = ExecutionEvent(
+            timestamp=time.time(),
+            event_type="listener_started",
+            event_data={
+                "listener_id": listener_id,
+                "payload": listener_info.payload,
+                "endpoint": f"{listener_info.lhost}:{listener_info.lport}",
+            },
+            description=f"Listener {listener_id} started ({listener_info.payload})",
+        )
+
+        with self._listeners_lock.gen_wlock():
+            replaced = self.active_listeners.get(listener_id)
             self.active_listeners[listener_id] = tracked_listener
-
-            # Add to history
-            event = ExecutionEvent(
-                timestamp=time.time(),
-                event_type="listener_started",
-                event_data={
-                    "listener_id": listener_id,
-                    "payload": listener_info.payload,
-                    "endpoint": f"{listener_info.lhost}:{listener_info.lport}",
-                },
-                description=f"Listener {listener_id} started ({listener_info.payload})",
-            )
-            self.execution_history.append(event)
-
-            # Emit callback
-            self._emit_event_callback(
-                "listener_started",
-                {"listener_id": listener_id, "listener_info": listener_info.__dict__},
-            )
-
-        logger.info(f"Tracking listener {listener_id} ({listener_info.payload})")
+            self._listeners_snapshot = MappingProxyType(dict(self.active_listeners))
+            self._dirty = True
+            # Re-tracking an ID drops the old record; keep the total in step
+            if replaced is not None:
+                self._listener_connections_total -= replaced.connection_count
+
+        self._record_event(event)
+        self._emit_event_callback(
+            "listener_started",
+            {"listener_id": listener_id, "listener_info": asdict(listener_info)},
+        )
+        self.start_monitoring()
+        logger.info("Tracking listener %s (%s)", listener_id, listener_info.payload)
         return listener_id
 
     def track_listener_stopped(self, listener_id: str, reason: str = "unknown") -> bool:
@@ -366,36 +640,34 @@ class ExecutionMonitor:
         Returns:
             True if listener was tracked and stopped
         """
-        with self._lock:
-            if listener_id not in self.active_listeners:
+        with self._listeners_lock.gen_wlock():
+            tracked_listener = self.active_listeners.pop(listener_id, None)
+            if tracked_listener is None:
                 return False
-
-            tracked_listener = self.active_listeners[listener_id]
             tracked_listener.state = ListenerState.STOPPED
-
-            # Add to history
-            event = ExecutionEvent(
-                timestamp=time.time(),
-                event_type="listener_stopped",
-                event_data={
-                    "listener_id": listener_id,
-                    "reason": reason,
-                    "lifetime": time.time() - tracked_listener.created_at,
-                    "connection_count": tracked_listener.connection_count,
-                },
-                description=f"Listener {listener_id} stopped ({reason})",
-            )
-            self.execution_history.append(event)
-
-            # Remove from active listeners
-            del self.active_listeners[listener_id]
-
-            # Emit callback
-            self._emit_event_callback(
-                "listener_stopped", {"listener_id": listener_id, "reason": reason}
-            )
-
-        logger.info(f"Stopped tracking listener {listener_id}")
+            self._listeners_snapshot = MappingProxyType(dict(self.active_listeners))
+            self._dirty = True
+            self._listener_connections_total -= tracked_listener.connection_count
+
+        now = time.time()
+        event = ExecutionEvent(
+            timestamp=now,
+            event_type="listener_stopped",
+            event_data={
+                "listener_id": listener_id,
+                "reason": reason,
+                "lifetime": now - tracked_listener.created_at,
+                "connection_count": tracked_listener.connection_count,
+            },
+            description=f"Listener {listener_id} stopped ({reason})",
+        )
+
+        self._record_event(event)
+        self._emit_event_callback(
+            "listener_stopped", {"listener_id": listener_id, "reason": reason}
+        )
+        self._stop_monitoring_if_idle()
+        logger.info("Stopped tracking listener %s", listener_id)
         return True
 
     def update_session_activity(
@@ -412,25 +684,31 @@ class ExecutionMonitor:
         Returns:
             True if session was found and updated
         """
-        with self._lock:
+        with self._sessions_lock.gen_wlock():
             if session_id not in self.active_sessions:
                 return False
 
             tracked_session = self.active_sessions[session_id]
             tracked_session.last_activity = time.time()
+            self._dirty = True
 
             if command_executed:
                 tracked_session.command_count += 1
+                self._totals["commands"] += 1
                 if success:
                     tracked_session.success_count += 1
+                    self._totals["success"] += 1
                 else:
                     tracked_session.error_count += 1
+                    self._totals["errors"] += 1
 
             # Update state based on activity
             if tracked_session.state == SessionState.IDLE:
                 tracked_session.state = SessionState.ACTIVE
+            self._schedule_deadline(session_id, tracked_session)
 
-            return True
+        self._wake_monitor()
+        return True
 
     def increment_listener_connections(self, listener_id: str) -> bool:
         """
@@ -442,24 +720,24 @@ class ExecutionMonitor:
         Returns:
             True if listener was found and updated
         """
-        with self._lock:
+        with self._listeners_lock.gen_wlock():
             if listener_id not in self.active_listeners:
                 return False
 
             tracked_listener = self.active_listeners[listener_id]
             tracked_listener.connection_count += 1
+            self._dirty = True
+            self._listener_connections_total += 1
 
             return True
 
-    def get_active_sessions(self) -> Dict[str, TrackedSession]:
-        """Get all active sessions."""
-        with self._lock:
-            return self.active_sessions.copy()
+    def get_active_sessions(self) -> Mapping[str, TrackedSession]:
+        """Get a read-only view of all active sessions."""
+        return self._sessions_snapshot
 
-    def get_active_listeners(self) -> Dict[str, TrackedListener]:
-        """Get all active listeners."""
-        with self._lock:
-            return self.active_listeners.copy()
+    def get_active_listeners(self) -> Mapping[str, TrackedListener]:
+        """Get a read-only view of all active listeners."""
+        return self._listeners_snapshot
 
     def get_execution_history(self, limit: int = 100) -> List[ExecutionEvent]:
         """
@@ -471,8 +749,28 @@ class ExecutionMonitor:
         Returns:
             List of execution events
         """
-        with self._lock:
-            return self.execution_history[-limit:]
+        history = self.execution_history
+        while True:
+            try:
+                if limit <= 0:
+                    return list(history)
+                # Walk back from the newest event so only `limit` items are touched
+                recent = list(itertools.islice(reversed(history), limit))
+                break
+            except RuntimeError:
+                # An event was recorded mid-copy (history is not locked); retry
+                continue
+        recent.reverse()
+        return recent
+
+    def _record_event(self, event: ExecutionEvent) -> None:
+        """
+        Append an event to the execution history.
+
+        deque.append is atomic, so trackers record events after releasing
+        the state lock; the bounded deque drops the oldest event when full.
+        """
+        self.execution_history.append(event)
 
     def get_session_summary(self) -> Dict[str, any]:
         """
@@ -481,15 +779,11 @@ class ExecutionMonitor:
         Returns:
             Summary dictionary
         """
-        with self._lock:
+        with self._sessions_lock.gen_rlock():
             total_sessions = len(self.active_sessions)
-            total_commands = sum(
-                ts.command_count for ts in self.active_sessions.values()
-            )
-            total_success = sum(
-                ts.success_count for ts in self.active_sessions.values()
-            )
-            total_errors = sum(ts.error_count for ts in self.active_sessions.values())
+            total_commands = self._totals["commands"]
+            total_success = self._totals["success"]
+            total_errors = self._totals["errors"]
 
             return {
                 "active_sessions": total_sessions,
@@ -506,39 +800,95 @@ class ExecutionMonitor:
         Returns:
             Summary dictionary
         """
-        with self._lock:
+        with self._listeners_lock.gen_rlock():
             total_listeners = len(self.active_listeners)
-            total_connections = sum(
-                tl.connection_count for tl in self.active_listeners.values()
-            )
+            total_connections = self._listener_connections_total
 
             return {
                 "active_listeners": total_listeners,
                 "total_connections": total_connections,
             }
 
-    def _emit_event_callback(self, event_type: str, event_data: Dict[str, str]) -> None:
+    def _emit_event_callback(self, event_type: str, event_data: Dict[str, Any]) -> None:
         """Emit event to status callbacks."""
-        for callback in self.status_callbacks:
+        self._dispatch_callbacks(event_type, event_data)
+
+    def _dispatch_callbacks(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Queue an event for the callback worker, dropping it if the queue is full."""
+        callbacks = self.status_callbacks
+        if not callbacks:
+            return
+
+        if self._callback_thread is None:
+            self._start_callback_worker()
+
+        try:
+            self._callback_queue.put_nowait((callbacks, event_type, data))
+        except queue.Full:
+            self._dropped_callbacks += 1
+            if self._dropped_callbacks == 1 or self._dropped_callbacks % 100 == 0:
+                logger.warning(
+                    "Callback queue full, dropped %d event(s) so far", self._dropped_callbacks
+                )
+
+    def _start_callback_worker(self) -> None:
+        """Start the callback worker thread if it is not running."""
+        with self._callbacks_lock:
+            if self._callback_thread is None:
+                self._callback_thread = threading.Thread(
+                    target=self._callback_worker, name="exec-mon-callbacks", daemon=True
+                )
+                self._callback_thread.start()
+
+    def _callback_worker(self) -> None:
+        """Deliver queued events to their callbacks until told to stop."""
+        callback_queue = self._callback_queue
+        while True:
+            item = callback_queue.get()
             try:
-                callback(event_type, event_data)
-            except Exception as e:
-                logger.error(f"Error in event callback: {e}")
+                if item is None:
+                    return
+                callbacks, event_type, data = item
+                kind = "status" if event_type == "status_update" else "event"
+                for callback in callbacks:
+                    try:
+                        callback(event_type, data)
+                    except Exception as e:
+                        logger.error("Error in %s callback: %s", kind, e)
+            finally:
+                callback_queue.task_done()
+
+    def flush_callbacks(self) -> None:
+        """Block until every event queued so far has been delivered to callbacks."""
+        if self._callback_thread is not None:
+            self._callback_queue.join()
+
+    def _stop_callback_worker(self) -> None:
+        """Deliver pending events, then stop the callback worker."""
+        with self._callbacks_lock:
+            thread, self._callback_thread = self._callback_thread, None
+        if thread is None:
+            return
+        self._callback_queue.put(None)
+        thread.join(timeout=2.0)
 
     def cleanup_all(self) -> None:
         """Cleanup all tracked sessions and listeners."""
-        with self._lock:
-            # Close all active sessions
-            session_ids = list(self.active_sessions.keys())
-            for session_id in session_ids:
-                self.track_session_closed(session_id, reason="cleanup")
-
-            # Stop all active listeners
-            listener_ids = list(self.active_listeners.keys())
-            for listener_id in listener_ids:
-                self.track_listener_stopped(listener_id, reason="cleanup")
-
-            # Stop monitoring
-            self.stop_monitoring()
+        with self._sessions_lock.gen_rlock():
+            session_ids = list(self.active_sessions)
+        with self._listeners_lock.gen_rlock():
+            listener_ids = list(self.active_listeners)
+
+        # Close all active sessions
+        for session_id in session_ids:
+            self.track_session_closed(session_id, reason="cleanup")
+
+        # Stop all active listeners
+        for listener_id in listener_ids:
+            self.track_listener_stopped(listener_id, reason="cleanup")
+
+        # Stop monitoring (not under a lock: the loop may be waiting for it)
+        self.stop_monitoring()
+        self._stop_callback_worker()
 
         logger.info("Execution monitor cleanup completed")
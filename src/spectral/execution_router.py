@@ -7,9 +7,10 @@ based on complexity and intent.
 Updated to support autonomous pentesting routing.
 """
 
+import functools
 import logging
 import re
-from typing import Optional, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 from spectral.execution_models import ExecutionMode
 
@@ -127,6 +128,386 @@ PYTHON_STDLIB = {
     "gettext",
 }
 
+# "How do I use X"-style requests that call for researching tool X first, in
+# priority order: when several match, the earliest branch naming a non-stdlib
+# tool wins, wherever it sits in the input. Each branch is a named group inside
+# a lookahead so one scan sees every branch's first match, including ones that
+# overlap ("learn how to use pandas" must still reach "how to use pandas").
+# should_research prefilters on a literal from each branch, so keep the two
+# in step.
+_RESEARCH_BRANCHES = (
+    r"how to use",
+    r"how do i use",
+    r"show me how to use",
+    r"demonstrate",
+    r"example of\s+using",
+    r"teach me",
+    r"learn",
+    r"how can i use",
+    r"what's the way to use",
+)
+_RESEARCH_RE = re.compile(
+    "(?=(?:%s))"
+    % "|".join(rf"{branch}\s+(?P<r{i}>\w+)" for i, branch in enumerate(_RESEARCH_BRANCHES))
+)
+
+
+def _trie_regex(phrases: Iterable[str]) -> str:
+    """
+    Build a prefix-factored alternation matching any of the phrases.
+
+    Shared prefixes are matched once, and at any start position the longest
+    phrase that matches wins (every branch is greedy).
+    """
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        optional = "" in node
+        if len(branches) > 1:
+            body = "(?:" + "|".join(branches) + ")"
+        elif optional and len(branches[0]) > 1:
+            body = f"(?:{branches[0]})"
+        else:
+            body = branches[0]
+        return body + "?" if optional else body
+
+    return build(trie)
+
+
+class _PhraseMatcher:
+    """
+    Finds which of a fixed set of phrases occur in a text, exactly as
+    ``phrase in text`` would, in one regex scan rather than one per phrase.
+    """
+
+    def __init__(self, phrases: Iterable[str]) -> None:
+        self.phrases: FrozenSet[str] = frozenset(phrases)
+        self._search = re.compile(_trie_regex(self.phrases)).search
+        # A match is the longest phrase at its start, so credit the phrases it contains
+        self._contained = {
+            phrase: frozenset(other for other in self.phrases if other in phrase)
+            for phrase in self.phrases
+        }
+
+    def count(self, text: str, stop_at: Optional[int] = None) -> int:
+        """
+        Count distinct phrases occurring in the text.
+
+        Args:
+            text: Text to scan
+            stop_at: Stop scanning once this many phrases have been found
+
+        Returns:
+            Number of distinct phrases found (capped near ``stop_at`` if given)
+        """
+        found: set = set()
+        match = self._search(text)
+        while match:
+            found |= self._contained[match.group()]
+            if stop_at is not None and len(found) >= stop_at:
+                break
+            # Restart one character on so overlapping phrases are still seen
+            match = self._search(text, match.start() + 1)
+        return len(found)
+
+
+_PENTESTING_MATCHER = _PhraseMatcher(PENTESTING_KEYWORDS)
+
+# Explicit pentesting phrasings; any one of them is enough on its own
+_PENTEST_PATTERNS = (
+    r"\bexploit\b.*\bwindows\b",
+    r"\bexploit\b.*\blinux\b",
+    r"\bmsfconsole\b",
+    r"\bmsfvenom\b",
+    r"\breverse shell\b",
+    r"\bbind shell\b",
+    r"\bpayload\b.*\bwindows\b",
+    r"\bpayload\b.*\blinux\b",
+    r"\bget shell\b",
+    r"\bport scan\b",
+    r"\bservice scan\b",
+    r"\bprivilege escalation\b",
+    r"\bpost exploitation\b",
+    r"\bmetasploit\b.*\bexploit\b",
+    r"\bscan\b.*\btarget\b",
+    r"\bscan\b.*\bvulnerabilities\b",
+)
+_PENTEST_PATTERN_RE = re.compile("|".join(_PENTEST_PATTERNS))
+
+# Distinct (router, normalized input) classifications remembered across all routers
+_CLASSIFY_CACHE_SIZE = 512
+
+# Self-referential questions (about Spectral itself)
+_SELF_REFERENCE_RE = re.compile(
+    _trie_regex(
+        (
+            "what is your",
+            "what are you",
+            "who are you",
+            "what can you",
+            "what do you",
+            "what's your",
+            "whats your",
+            "tell me about you",
+            "tell me about yourself",
+            "your name",
+        )
+    )
+)
+
+# Explicit multi-step security workflows inside a creation command
+_MULTI_STEP_SECURITY = (
+    "reverse shell with persistence",
+    "reverse shell with",
+    "shell with persistence",
+    "persistence and exfil",
+    "persistence and",
+    "and exfil",
+    "analyze and create",
+    "analyze this malware and",
+    "full reverse shell",
+    "complete reverse shell",
+)
+_MULTI_STEP_SECURITY_RE = re.compile(_trie_regex(_MULTI_STEP_SECURITY))
+
+# The same workflows plus the broader ones that make any request complex
+_COMPLEX_SECURITY_RE = re.compile(
+    _trie_regex(
+        _MULTI_STEP_SECURITY
+        + (
+            "scan and exploit",
+            "find and exploit",
+            "enumerate and",
+            "full pentesting",
+            "complete pentesting",
+            "create detection rules",
+        )
+    )
+)
+
+# Greetings and casual openers: the whole input, or its first words before a space
+_GREETING_RE = re.compile(
+    "(?:"
+    + _trie_regex(
+        (
+            "hello",
+            "hi",
+            "hey",
+            "greetings",
+            "good morning",
+            "good afternoon",
+            "good evening",
+            "whats up",
+            "what's up",
+            "sup",
+            "how are you",
+            "how are you doing",
+            "how do you do",
+            "what's good",
+            "whats good",
+        )
+    )
+    + r")(?: |\Z)"
+)
+
+# Requests that only mention code as an example, not as something to research
+_META_PROMPT_RE = re.compile(
+    _trie_regex(("on purpose", "intentionally", "as an example", "for demonstration"))
+)
+
+# Technical terms that keep even a very short input out of the casual fast path
+_STRONG_TECH_RE = re.compile(
+    _trie_regex(("error", "exception", "install", "setup", "configure", "deploy"))
+)
+
+# Routing of very short inputs (< 4 words), keyed on
+# (leads with a direct action verb, mentions a strong technical keyword).
+# Shapes not listed fall through to the full classification.
+_SHORT_INPUT_ROUTES: Dict[Tuple[bool, bool], Tuple[ExecutionMode, float, str]] = {
+    (True, False): (ExecutionMode.DIRECT, 0.85, "Short input with direct action verb"),
+    (True, True): (ExecutionMode.DIRECT, 0.85, "Short input with direct action verb"),
+    (False, False): (
+        ExecutionMode.DIRECT,
+        0.4,
+        "Short input without strong technical keywords, skipping research",
+    ),
+}
+
+# Leading verbs of creation commands, which are never routed to research
+_CREATION_PREFIXES = ("write", "create", "build", "generate", "implement", "make", "develop")
+
+# Phrases that each add a full point to the research score
+_EXPLICIT_RESEARCH_QUERIES = ("how to", "what is", "find out", "explain", "look up", "how do i")
+
+# Alphanumeric word tokens; unlike str.split this drops punctuation ("run," -> "run")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Leading words that make an input a question
+_QUESTION_WORDS = frozenset({"how", "what", "why", "when", "where", "can", "does", "is"})
+
+# Opening word pairs of action-questions that are really execution requests
+_ACTION_QUESTIONS = frozenset({("what", "ports"), ("what", "services")})
+
+# Words joining several actions into one request
+_CONJUNCTIONS = frozenset({"and", "with", "then", "also", "plus", "including"})
+
+# System info requests stay direct even though "system" is a planning keyword
+_SIMPLE_INFO_REQUESTS = (
+    "get my system info",
+    "get system info",
+    "show system info",
+    "system information",
+    "my system info",
+)
+
+_POLITE_PREFIXES = ("can you ", "could you ", "would you ", "will you ", "please ", "pls ")
+
+# "Analyze X and create Y"-style multi-step workflows
+_MULTI_STEP_ACTION_RE = re.compile(
+    _trie_regex(
+        (
+            "analyze and create",
+            "analyze this malware and",
+            "scan and exploit",
+            "find and exploit",
+            "enumerate and",
+        )
+    )
+)
+
+
+# Direct mode keywords (simple, single-action requests)
+_DIRECT_KEYWORDS = frozenset(
+    {
+        "write",
+        "code",
+        "program",
+        "script",
+        "run",
+        "execute",
+        "create",
+        "generate",
+        "build",
+        "make",
+        "implement",
+        "develop",
+        "search",
+        "find",
+        "list",
+        "check",
+        "scan",
+        "show",
+        "get",
+        "open",
+        "close",
+        "exploit",  # Security action verb
+    }
+)
+
+# Planning mode keywords (complex, multi-step requests)
+# Keep this list focused: only keywords that strongly indicate a multi-phase workflow.
+_PLANNING_KEYWORDS = frozenset(
+    {
+        "then",
+        "also",
+        "including",
+        "after",
+        "afterward",
+        "multi",
+        "multiple",
+        "step",
+        "phase",
+        "stage",
+        "pipeline",
+        "workflow",
+        "architecture",
+        "framework",
+        "system",
+        "application",
+        "platform",
+        "setup",
+        "configure",
+        "deploy",
+        "integrate",
+        "chain",
+    }
+)
+
+# Complexity indicators (suggest planning mode)
+_COMPLEXITY_INDICATORS = frozenset(
+    {
+        "error handling",
+        "logging",
+        "testing",
+        "validation",
+        "authentication",
+        "database",
+        "api",
+        "server",
+        "client",
+        "frontend",
+        "backend",
+        "web scraper",
+        "scraper",
+        "parser",
+        "processor",
+        "manager",
+        "controller",
+    }
+)
+
+# Research keywords (information gathering)
+_RESEARCH_KEYWORDS = frozenset(
+    {
+        "how do i",
+        "how to",
+        "what is",
+        "what does",
+        "does it support",
+        "can i",
+        "install",
+        "set up",
+        "configure",
+        "error",
+        "problem",
+        "issue",
+        "troubleshoot",
+        "fix",
+        "solve",
+        "find out",
+        "learn",
+        "understand",
+        "explain",
+        "guide",
+        "tutorial",
+    }
+)
+
+# (direct, planning, conjunction) membership of every keyword word, so counting
+# all three takes one lookup per input word
+_KEYWORD_COUNTS: Dict[str, Tuple[int, int, int]] = {
+    word: (
+        int(word in _DIRECT_KEYWORDS),
+        int(word in _PLANNING_KEYWORDS),
+        int(word in _CONJUNCTIONS),
+    )
+    for word in _DIRECT_KEYWORDS | _PLANNING_KEYWORDS | _CONJUNCTIONS
+}
+
+
+def _normalize(user_input: str) -> str:
+    """Strip and lowercase a request, the form every router check works on."""
+    # Strip first so lower() never copies the surrounding whitespace
+    return user_input.strip().lower()
+
 
 class ExecutionRouter:
     """
@@ -138,107 +519,14 @@ class ExecutionRouter:
     RESEARCH_AND_ACT mode: Research then execute based on findings
     """
 
+    # Keyword sets, shared by every router
+    direct_keywords = _DIRECT_KEYWORDS
+    planning_keywords = _PLANNING_KEYWORDS
+    complexity_indicators = _COMPLEXITY_INDICATORS
+    research_keywords = _RESEARCH_KEYWORDS
+
     def __init__(self) -> None:
         """Initialize the execution router."""
-        # Direct mode keywords (simple, single-action requests)
-        self.direct_keywords = {
-            "write",
-            "code",
-            "program",
-            "script",
-            "run",
-            "execute",
-            "create",
-            "generate",
-            "build",
-            "make",
-            "implement",
-            "develop",
-            "search",
-            "find",
-            "list",
-            "check",
-            "scan",
-            "show",
-            "get",
-            "open",
-            "close",
-            "exploit",  # Security action verb
-        }
-
-        # Planning mode keywords (complex, multi-step requests)
-        # Keep this list focused: only keywords that strongly indicate a multi-phase workflow.
-        self.planning_keywords = {
-            "then",
-            "also",
-            "including",
-            "after",
-            "afterward",
-            "multi",
-            "multiple",
-            "step",
-            "phase",
-            "stage",
-            "pipeline",
-            "workflow",
-            "architecture",
-            "framework",
-            "system",
-            "application",
-            "platform",
-            "setup",
-            "configure",
-            "deploy",
-            "integrate",
-            "chain",
-        }
-
-        # Complexity indicators (suggest planning mode)
-        self.complexity_indicators = {
-            "error handling",
-            "logging",
-            "testing",
-            "validation",
-            "authentication",
-            "database",
-            "api",
-            "server",
-            "client",
-            "frontend",
-            "backend",
-            "web scraper",
-            "scraper",
-            "parser",
-            "processor",
-            "manager",
-            "controller",
-        }
-
-        # Research keywords (information gathering)
-        self.research_keywords = {
-            "how do i",
-            "how to",
-            "what is",
-            "what does",
-            "does it support",
-            "can i",
-            "install",
-            "set up",
-            "configure",
-            "error",
-            "problem",
-            "issue",
-            "troubleshoot",
-            "fix",
-            "solve",
-            "find out",
-            "learn",
-            "understand",
-            "explain",
-            "guide",
-            "tutorial",
-        }
-
         logger.info("ExecutionRouter initialized")
 
     def should_research(self, user_input: str) -> Tuple[bool, Optional[str]]:
@@ -253,32 +541,37 @@ class ExecutionRouter:
         Returns:
             Tuple of (should_research, tool_name)
         """
-        input_lower = user_input.lower().strip()
-
-        # Research-needed patterns
-        research_patterns = [
-            r"how to use\s+(\w+)",
-            r"how do i use\s+(\w+)",
-            r"show me how to use\s+(\w+)",
-            r"demonstrate\s+(\w+)",
-            r"example of\s+using\s+(\w+)",
-            r"teach me\s+(\w+)",
-            r"learn\s+(\w+)",
-            r"how can i use\s+(\w+)",
-            r"what's the way to use\s+(\w+)",
-        ]
-
-        for pattern in research_patterns:
-            match = re.search(pattern, input_lower)
-            if match:
-                tool_name = match.group(1)
-
-                # Don't research common Python stdlib modules
-                if tool_name in PYTHON_STDLIB:
-                    continue
-
-                logger.info(f"Research needed for tool: {tool_name}")
-                return True, tool_name
+        input_lower = _normalize(user_input)
+
+        # Every research phrasing contains one of these words. Most requests
+        # contain none, and these containment checks are far cheaper than the
+        # regex scan.
+        if not (
+            "how" in input_lower
+            or "demo" in input_lower
+            or "teach" in input_lower
+            or "learn" in input_lower
+            or "example" in input_lower
+            or "what's" in input_lower
+        ):
+            return False, None
+
+        # First tool named by each branch, keyed by branch priority
+        first_hits: Dict[int, str] = {}
+        for match in _RESEARCH_RE.finditer(input_lower):
+            branch = match.lastindex
+            if branch is not None and branch not in first_hits:
+                first_hits[branch] = match.group(branch)
+
+        for branch in sorted(first_hits):
+            tool_name = first_hits[branch]
+
+            # Don't research common Python stdlib modules
+            if tool_name in PYTHON_STDLIB:
+                continue
+
+            logger.info("Research needed for tool: %s", tool_name)
+            return True, tool_name
 
         return False, None
 
@@ -292,42 +585,16 @@ class ExecutionRouter:
         Returns:
             True if this is a pentesting request
         """
-        input_lower = user_input.lower().strip()
-
-        # Check for pentesting keywords
-        keyword_count = sum(
-            1 for keyword in PENTESTING_KEYWORDS if keyword in input_lower
-        )
+        return self._is_pentesting_request(_normalize(user_input))
 
+    def _is_pentesting_request(self, input_lower: str) -> bool:
+        """Check normalized input for pentesting; see is_pentesting_request."""
         # If we find 2 or more pentesting keywords, it's likely a pentesting request
-        if keyword_count >= 2:
+        if _PENTESTING_MATCHER.count(input_lower, stop_at=2) >= 2:
             return True
 
         # Check for explicit patterns
-        pentest_patterns = [
-            r"\bexploit\b.*\bwindows\b",
-            r"\bexploit\b.*\blinux\b",
-            r"\bmsfconsole\b",
-            r"\bmsfvenom\b",
-            r"\breverse shell\b",
-            r"\bbind shell\b",
-            r"\bpayload\b.*\bwindows\b",
-            r"\bpayload\b.*\blinux\b",
-            r"\bget shell\b",
-            r"\bport scan\b",
-            r"\bservice scan\b",
-            r"\bprivilege escalation\b",
-            r"\bpost exploitation\b",
-            r"\bmetasploit\b.*\bexploit\b",
-            r"\bscan\b.*\btarget\b",  # Added scan target pattern
-            r"\bscan\b.*\bvulnerabilities\b",  # Added scan vulnerabilities pattern
-        ]
-
-        for pattern in pentest_patterns:
-            if re.search(pattern, input_lower):
-                return True
-
-        return False
+        return _PENTEST_PATTERN_RE.search(input_lower) is not None
 
     def classify(self, user_input: str) -> Tuple[ExecutionMode, float]:
         """
@@ -339,160 +606,111 @@ class ExecutionRouter:
         Returns:
             Tuple of (ExecutionMode, confidence_score)
         """
-        logger.debug(f"Classifying execution mode for: {user_input}")
+        logger.debug("Classifying execution mode for: %s", user_input)
 
-        input_lower = user_input.lower().strip()
-        words = input_lower.split()
+        # Classification only looks at the normalized text, so cache on that
+        return self._classify(_normalize(user_input))
+
+    def classify_batch(self, user_inputs: Iterable[str]) -> List[Tuple[ExecutionMode, float]]:
+        """
+        Classify many user inputs, e.g. when re-routing a chat history.
+
+        Each distinct normalized input is classified once. Batches bypass the
+        classify cache so they don't evict the entries interactive use relies on.
+
+        Args:
+            user_inputs: User requests to classify
 
+        Returns:
+            One (ExecutionMode, confidence_score) per input, in input order
+        """
+        classify_uncached = self._classify.__wrapped__
+        seen: Dict[str, Tuple[ExecutionMode, float]] = {}
+        results = []
+        for user_input in user_inputs:
+            input_lower = _normalize(user_input)
+            result = seen.get(input_lower)
+            if result is None:
+                result = seen[input_lower] = classify_uncached(self, input_lower)
+            results.append(result)
+        return results
+
+    # is_direct_mode/is_planning_mode often classify the same input back to back.
+    # Routers are small and live as long as their owners, so holding them is fine.
+    @functools.lru_cache(maxsize=_CLASSIFY_CACHE_SIZE)
+    def _classify(self, input_lower: str) -> Tuple[ExecutionMode, float]:
+        """Classify normalized (lowercased, stripped) input; see classify."""
         # EARLY EXIT: Check for pentesting requests first
-        if self.is_pentesting_request(user_input):
+        if self._is_pentesting_request(input_lower):
             logger.debug(
                 "Pentesting request detected, routing to autonomous pentesting"
             )
             return ExecutionMode.PLANNING, 0.95  # High confidence for pentesting
 
         # EARLY EXIT: Exclude self-referential questions (about Spectral itself)
-        self_ref_patterns = [
-            "what is your",
-            "what are you",
-            "who are you",
-            "what can you",
-            "what do you",
-            "what's your",
-            "whats your",
-            "tell me about you",
-            "tell me about yourself",
-            "your name",
-        ]
-        if any(pattern in input_lower for pattern in self_ref_patterns):
+        if _SELF_REFERENCE_RE.search(input_lower):
             logger.debug("Self-referential question detected, skipping research")
             # Route to casual conversation (use direct mode with low confidence)
             return ExecutionMode.DIRECT, 0.3
 
         # EARLY EXIT: Exclude greetings and casual openers
-        greetings = [
-            "hello",
-            "hi",
-            "hey",
-            "greetings",
-            "good morning",
-            "good afternoon",
-            "good evening",
-            "whats up",
-            "what's up",
-            "sup",
-            "how are you",
-            "how are you doing",
-            "how do you do",
-            "what's good",
-            "whats good",
-        ]
         # Check if input is primarily a greeting
-        if any(
-            greeting == input_lower or input_lower.startswith(greeting + " ")
-            for greeting in greetings
-        ):
+        if _GREETING_RE.match(input_lower):
             logger.debug("Greeting detected, skipping research")
             return ExecutionMode.DIRECT, 0.3
 
+        # The exits above only scan the text; the rest also looks at its words
+        words = input_lower.split()
+
         # EARLY EXIT: Very short inputs (< 4 words) are unlikely to be research queries.
         # If the user leads with a clear action verb ("run", "list", "check", ...),
         # keep confidence high so the orchestrator actually executes the request.
         if len(words) < 4:
-            if words and words[0] in self.direct_keywords:
-                logger.debug("Short input with direct action verb")
-                return ExecutionMode.DIRECT, 0.85
-
-            strong_tech_keywords = [
-                "error",
-                "exception",
-                "install",
-                "setup",
-                "configure",
-                "deploy",
-            ]
-            has_strong_tech = any(
-                keyword in input_lower for keyword in strong_tech_keywords
-            )
-            if not has_strong_tech:
-                logger.debug(
-                    "Short input without strong technical keywords, skipping research"
+            route = _SHORT_INPUT_ROUTES.get(
+                (
+                    bool(words) and words[0] in _DIRECT_KEYWORDS,
+                    _STRONG_TECH_RE.search(input_lower) is not None,
                 )
-                return ExecutionMode.DIRECT, 0.4
+            )
+            if route:
+                mode, confidence, reason = route
+                logger.debug(reason)
+                return mode, confidence
 
         # EARLY EXIT: Exclude creation commands from research
-        creation_keywords = [
-            "write",
-            "create",
-            "build",
-            "generate",
-            "implement",
-            "make",
-            "develop",
-        ]
-        if any(input_lower.startswith(kw) for kw in creation_keywords):
+        if input_lower.startswith(_CREATION_PREFIXES):
             logger.debug(
                 "Creation command detected, routing to DIRECT/PLANNING instead of RESEARCH"
             )
             # Check if it's a complex multi-step creation
             # First check for explicit multi-step security patterns
-            multi_step_security = [
-                "reverse shell with persistence",
-                "reverse shell with",
-                "shell with persistence",
-                "persistence and exfil",
-                "persistence and",
-                "and exfil",
-                "analyze and create",
-                "analyze this malware and",
-                "full reverse shell",
-                "complete reverse shell",
-            ]
-            if any(phrase in input_lower for phrase in multi_step_security):
+            if _MULTI_STEP_SECURITY_RE.search(input_lower):
                 logger.debug(
                     "Multi-step security workflow detected in creation command"
                 )
                 return ExecutionMode.PLANNING, 0.8
 
             # Determine between DIRECT and PLANNING
-            direct_keyword_count = sum(
-                1 for word in words if word in self.direct_keywords
-            )
-            planning_keyword_count = sum(
-                1 for word in words if word in self.planning_keywords
-            )
+            direct_keyword_count, planning_keyword_count, _ = self._count_keywords(words)
             if planning_keyword_count > direct_keyword_count or len(words) > 10:
                 return ExecutionMode.PLANNING, 0.8
             return ExecutionMode.DIRECT, 0.8
 
         # EARLY EXIT: Exclude meta-prompts from research
-        meta_prompts = [
-            "on purpose",
-            "intentionally",
-            "as an example",
-            "for demonstration",
-        ]
-        if any(pattern in input_lower for pattern in meta_prompts):
+        if _META_PROMPT_RE.search(input_lower):
             logger.debug("Meta-prompt detected, avoiding research")
             return ExecutionMode.DIRECT, 0.7
 
         # FAST PATH for multi-step workflows: check BEFORE simple direct check
         # to catch "analyze X and create Y" type requests
-        multi_step_action_patterns = [
-            "analyze and create",
-            "analyze this malware and",
-            "scan and exploit",
-            "find and exploit",
-            "enumerate and",
-        ]
-        if any(phrase in input_lower for phrase in multi_step_action_patterns):
+        if _MULTI_STEP_ACTION_RE.search(input_lower):
             logger.debug("Multi-step action pattern detected")
             return ExecutionMode.PLANNING, 0.8
 
         # FAST PATH: keep simple, single-step actions in DIRECT mode.
         # This prevents over-routing to PLANNING for requests like "list files" or
         # "check port 22".
-        if self._is_simple_direct_request(user_input):
+        if self._is_simple_direct_request(input_lower):
             logger.debug("Simple direct request detected")
             return ExecutionMode.DIRECT, 0.85
 
@@ -502,49 +720,45 @@ class ExecutionRouter:
         research_score = 0.0
 
         # Check for research patterns (strong signals)
-        explicit_research_queries = [
-            "how to",
-            "what is",
-            "find out",
-            "explain",
-            "look up",
-            "how do i",
-        ]
-        for pattern in explicit_research_queries:
+        for pattern in _EXPLICIT_RESEARCH_QUERIES:
             if pattern in input_lower:
                 research_score += 1.0
 
-        # Questions are usually research
-        if input_lower.startswith(
-            ("how", "what", "why", "when", "where", "can", "does", "is")
-        ):
+        # Questions are usually research. Match whole leading words, so "what's"
+        # counts but "however" and "island" do not.
+        first_word = _WORD_RE.match(input_lower)
+        if first_word and first_word.group() in _QUESTION_WORDS:
             research_score += 0.6
 
         # Question marks also indicate research
         if "?" in input_lower:
             research_score += 0.3
 
-        # Error messages suggest research
-        if any(
-            word in input_lower
-            for word in ["error", "failed", "exception", "traceback"]
+        # Error messages suggest research. Spelled out: str containment is a
+        # C-level fast search, where a generator, regex or bytes scan is slower.
+        if (
+            "error" in input_lower
+            or "failed" in input_lower
+            or "exception" in input_lower
+            or "traceback" in input_lower
         ):
             research_score += 0.6
 
-        # Check for direct mode keywords
-        direct_keyword_count = sum(1 for word in words if word in self.direct_keywords)
-        direct_score += direct_keyword_count * 0.3
-
-        # Check for planning mode keywords
-        planning_keyword_count = sum(
-            1 for word in words if word in self.planning_keywords
+        # Check for direct and planning mode keywords (conjunctions are used below)
+        direct_keyword_count, planning_keyword_count, conjunction_count = self._count_keywords(
+            words
         )
+        direct_score += direct_keyword_count * 0.3
         planning_score += planning_keyword_count * 0.4
 
-        # Check for complexity indicators (strong planning signal)
-        complexity_count = sum(
-            1 for phrase in self.complexity_indicators if phrase in input_lower
-        )
+        # Check for complexity indicators (strong planning signal). Each one
+        # counts once, nested ones too ("web scraper" also counts "scraper").
+        # Plain containment beats a combined or trie regex for these short
+        # literals at any input length, and a plain loop beats a sum() generator.
+        complexity_count = 0
+        for phrase in _COMPLEXITY_INDICATORS:
+            if phrase in input_lower:
+                complexity_count += 1
         planning_score += complexity_count * 0.5
 
         # Length penalty: longer requests tend to be planning mode
@@ -555,8 +769,6 @@ class ExecutionRouter:
             planning_score += 0.1
 
         # Check for conjunctions (suggests multi-step)
-        conjunctions = ["and", "with", "then", "also", "plus", "including"]
-        conjunction_count = sum(1 for word in words if word in conjunctions)
         if conjunction_count >= 2:
             planning_score += 0.3
 
@@ -584,62 +796,62 @@ class ExecutionRouter:
             mode = ExecutionMode.PLANNING
             confidence = 0.5
 
-        logger.info(f"Classified as {mode.value} mode with confidence {confidence:.2f}")
+        logger.info("Classified as %s mode with confidence %.2f", mode.value, confidence)
         logger.debug(
-            f"Scores - Direct: {direct_score:.2f}, Planning: {planning_score:.2f}, "
-            f"Research: {research_score:.2f}"
+            "Scores - Direct: %.2f, Planning: %.2f, Research: %.2f",
+            direct_score,
+            planning_score,
+            research_score,
         )
 
         return mode, confidence
 
-    def _is_simple_direct_request(self, user_input: str) -> bool:
+    def _count_keywords(self, words: List[str]) -> Tuple[int, int, int]:
+        """Count direct keywords, planning keywords and conjunctions in one pass over words."""
+        keyword_counts = _KEYWORD_COUNTS.get
+        direct_count = planning_count = conjunction_count = 0
+        for word in words:
+            counts = keyword_counts(word)
+            if counts:
+                direct_count += counts[0]
+                planning_count += counts[1]
+                conjunction_count += counts[2]
+        return direct_count, planning_count, conjunction_count
+
+    def _is_simple_direct_request(self, input_lower: str) -> bool:
         """Return True if this looks like a single, straightforward action.
 
         This is intentionally conservative: it only triggers when we see a clear
         action verb (run/list/check/search/etc.) and do *not* see multi-step or
         architectural/planning cues.
+
+        ``input_lower`` must already be lowercased and stripped, as classify does.
         """
 
-        input_lower = user_input.lower().strip()
-        words = re.findall(r"[a-z0-9]+", input_lower)
+        words = _WORD_RE.findall(input_lower)
         if not words:
             return False
 
         # Simple system info requests - check BEFORE complex check
         # because "system" is in planning_keywords
-        simple_info_requests = [
-            "get my system info",
-            "get system info",
-            "show system info",
-            "system information",
-            "my system info",
-        ]
-        if any(phrase in input_lower for phrase in simple_info_requests):
+        if any(phrase in input_lower for phrase in _SIMPLE_INFO_REQUESTS):
             return True
 
         if self._is_complex_request(input_lower, words):
             return False
 
         # Imperative verb at the start
-        if words[0] in self.direct_keywords:
+        if words[0] in _DIRECT_KEYWORDS:
             return True
 
         # Polite request form: "can you <verb> ...", "please <verb> ..."
-        polite_prefixes = [
-            "can you ",
-            "could you ",
-            "would you ",
-            "will you ",
-            "please ",
-            "pls ",
-        ]
-        if any(input_lower.startswith(prefix) for prefix in polite_prefixes):
+        if input_lower.startswith(_POLITE_PREFIXES):
             # Look for an action verb in the first few tokens after the prefix
-            return any(word in self.direct_keywords for word in words[0:8])
+            return not _DIRECT_KEYWORDS.isdisjoint(words[0:8])
 
         # Common action-questions that should still be treated as execution requests
         # (e.g. "what ports are open...")
-        if input_lower.startswith(("what ports", "what services")):
+        if tuple(words[:2]) in _ACTION_QUESTIONS:
             return True
 
         return False
@@ -653,48 +865,32 @@ class ExecutionRouter:
 
         # Avoid treating "check if ..." as multi-step conditional logic.
         if input_lower.startswith(("check if ", "see if ", "verify if ")):
-            conditional_markers = [" then ", " else ", " otherwise "]
-            return any(marker in input_lower for marker in conditional_markers)
+            return (
+                " then " in input_lower
+                or " else " in input_lower
+                or " otherwise " in input_lower
+            )
 
         # Multi-step pentesting/security workflows
-        multi_step_security = [
-            "reverse shell with persistence",
-            "reverse shell with",
-            "shell with persistence",
-            "persistence and exfil",
-            "persistence and",
-            "and exfil",
-            "scan and exploit",
-            "analyze and create",
-            "analyze this malware and",
-            "find and exploit",
-            "enumerate and",
-            "full reverse shell",
-            "complete reverse shell",
-            "full pentesting",
-            "complete pentesting",
-            "create detection rules",
-        ]
-        if any(phrase in input_lower for phrase in multi_step_security):
+        if _COMPLEX_SECURITY_RE.search(input_lower):
             return True
 
         # Explicit multi-step markers
-        multi_step_phrases = [
-            "and then",
-            "after that",
-            "then ",
-            "next ",
-            "also ",
-        ]
-        if any(phrase in input_lower for phrase in multi_step_phrases):
+        if (
+            "and then" in input_lower
+            or "after that" in input_lower
+            or "then " in input_lower
+            or "next " in input_lower
+            or "also " in input_lower
+        ):
             return True
 
         # Planning keywords / architectural cues
-        if any(word in self.planning_keywords for word in words):
+        if not _PLANNING_KEYWORDS.isdisjoint(words):
             return True
 
         # Complexity indicator phrases
-        if any(phrase in input_lower for phrase in self.complexity_indicators):
+        if any(phrase in input_lower for phrase in _COMPLEXITY_INDICATORS):
             return True
 
         # Long prompts tend to be multi-part
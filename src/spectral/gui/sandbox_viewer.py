@@ -314,6 +314,8 @@ class SandboxViewer(ctk.CTkFrame):
             "metasploit_output": self._on_metasploit_output,
             "session_created": self._on_session_created,
             "listener_started": self._on_listener_started,
+            # Batched events
+            "gui_events_batch": self._on_gui_events_batch,
         }
 
         handler = handlers.get(event_type)
@@ -619,6 +621,11 @@ class SandboxViewer(ctk.CTkFrame):
 
         self.update_listeners({listener_id: listener_info})
 
+    def _on_gui_events_batch(self, data: dict) -> None:
+        """Handle a batch of events delivered in a single UI-thread dispatch."""
+        for event_type, event_data in data.get("events", []):
+            self.handle_gui_callback(event_type, event_data)
+
     def clear_all(self) -> None:
         """Clear all panels."""
         if self.terminal_mode and hasattr(self, "terminal_emulator"):
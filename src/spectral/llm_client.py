@@ -55,6 +55,9 @@ class LLMClient:
         """
         Generate a response from the LLM using a simple prompt.
 
+        Safe to call from several threads: each call uses its own Ollama
+        client and only reads the configuration.
+
         Args:
             prompt: The prompt to send to the LLM
             temperature: Override default temperature
@@ -223,6 +223,32 @@ class SandboxRunManager:
             logger.error(error_msg)
             return False, error_msg
 
+    def _compile_source(self, code: str, filename: str) -> Tuple[bool, Optional[str]]:
+        """
+        Gate 1 (in-process): Compile source with the built-in compiler.
+
+        Equivalent to py_compile without spawning an interpreter. Sources too
+        deeply nested or too large to compile fail the gate rather than raise.
+
+        Args:
+            code: Source code to compile
+            filename: Filename reported in syntax errors
+
+        Returns:
+            Tuple of (syntax_valid, error_message)
+        """
+        try:
+            compile(code, filename, "exec")
+            return True, None
+        except (SyntaxError, ValueError) as e:
+            error_msg = f"Syntax Error: {e}"
+            logger.warning(f"Syntax check failed: {error_msg}")
+            return False, error_msg
+        except (RecursionError, MemoryError) as e:
+            error_msg = f"Syntax check error: source too complex to compile ({type(e).__name__})"
+            logger.warning(error_msg)
+            return False, error_msg
+
     def run_tests(self, run_id: str, test_dir: Path) -> Tuple[bool, str]:
         """
         Gate 2: Run pytest on generated tests.
@@ -440,8 +466,8 @@ class SandboxRunManager:
             # Gate 0: Write code to sandbox
             code_path = self.write_code(run_id, filename, code)
 
-            # Gate 1: Syntax check
-            syntax_ok, syntax_error = self.check_syntax(run_id, code_path)
+            # Gate 1: Syntax check, compiled from the source already in memory
+            syntax_ok, syntax_error = self._compile_source(code, filename)
             gates_passed["syntax"] = syntax_ok
 
             if not syntax_ok:
@@ -3,9 +3,12 @@ Utility functions for Spectral.
 """
 
 import ast
+import functools
+import getpass
 import logging
 import re
-from typing import List, Tuple
+from pathlib import Path
+from typing import List, Optional, Tuple
 
 AUTONOMOUS_CODE_REQUIREMENT = """
 ⚠️ CRITICAL: Generate FULLY AUTONOMOUS code with NO interactive input() calls.
@@ -160,21 +163,27 @@ class SmartInputHandler:
 
     def inject_test_inputs(self, code: str, test_inputs: List[str]) -> str:
         """Inject test inputs into code by replacing input() calls."""
-        import re
-
         modified_code = code
 
         for test_input in test_inputs:
             # Replace first input() call with hard-coded value
-            pattern = r"(\w+)\s*=\s*input\s*\([^)]*\)"
             replacement = f'\\1 = "{test_input}"'
-            modified_code = re.sub(pattern, replacement, modified_code, count=1)
+            modified_code = _INPUT_ASSIGN_RE.sub(replacement, modified_code, count=1)
 
         return modified_code
 
 
 logger = logging.getLogger(__name__)
 
+# Markdown fence patterns used by clean_code, which runs on every generation
+# and fix attempt.
+_CODE_BLOCK_RE = re.compile(r"```(?:\w+)?\s*\n([\s\S]*?)```")
+_OPENING_FENCE_RE = re.compile(r"^```\w*\s*")
+_CLOSING_FENCE_RE = re.compile(r"\s*```$")
+
+_INPUT_ASSIGN_RE = re.compile(r"(\w+)\s*=\s*input\s*\([^)]*\)")
+_CODING_COOKIE_RE = re.compile(r"coding[:=]\s*[-\w.]+")
+
 
 # Enhanced code cleaning function that uses CodeCleaner class
 def clean_code(code: str, raise_on_empty: bool = True) -> str:
@@ -207,8 +216,7 @@ def clean_code(code: str, raise_on_empty: bool = True) -> str:
     # Pattern 3: ```python ... ```
 
     # Match code blocks with language specifier
-    code_block_pattern = r"```(?:\w+)?\s*\n([\s\S]*?)```"
-    match = re.search(code_block_pattern, text)
+    match = _CODE_BLOCK_RE.search(text)
 
     if match:
         logger.debug("Extracted code from markdown code block")
@@ -216,8 +224,8 @@ def clean_code(code: str, raise_on_empty: bool = True) -> str:
 
     # If no code block found, try to remove standalone ``` markers
     # This handles cases like ```code```
-    text = re.sub(r"^```\w*\s*", "", text)  # Remove opening ```
-    text = re.sub(r"\s*```$", "", text)  # Remove closing ```
+    text = _OPENING_FENCE_RE.sub("", text)  # Remove opening ```
+    text = _CLOSING_FENCE_RE.sub("", text)  # Remove closing ```
 
     # Clean up any remaining whitespace
     cleaned = text.strip()
@@ -231,6 +239,23 @@ def clean_code(code: str, raise_on_empty: bool = True) -> str:
     return cleaned
 
 
+@functools.lru_cache(maxsize=1)
+def get_username() -> str:
+    """
+    Get the current user's login name, resolved once per process.
+
+    Falls back to the home directory name when no login name is available
+    (e.g. minimal containers or service accounts without USER/USERNAME).
+
+    Returns:
+        Username string
+    """
+    try:
+        return getpass.getuser()
+    except Exception:
+        return Path.home().name
+
+
 def truncate_text(text: str, max_length: int, suffix: str = "...") -> str:
     """
     Truncate text to a maximum length.
@@ -279,20 +304,22 @@ def extract_input_calls(code: str) -> List[ast.Call]:
     return input_calls
 
 
-def detect_input_calls(code: str) -> Tuple[int, List[str]]:
+def detect_input_calls(code: str, tree: Optional[ast.AST] = None) -> Tuple[int, List[str]]:
     """
     Detect input() calls in code and extract their prompts.
 
     Args:
         code: Python source code
+        tree: Optional pre-parsed AST of code (skips re-parsing)
 
     Returns:
         Tuple of (count of input calls, list of prompts)
     """
-    try:
-        tree = ast.parse(code)
-    except SyntaxError:
-        return 0, []
+    if tree is None:
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return 0, []
 
     input_count = 0
     prompts = []
@@ -388,20 +415,22 @@ def generate_test_inputs(prompts: List[str]) -> List[str]:
     return test_inputs
 
 
-def has_input_calls(code: str) -> bool:
+def has_input_calls(code: str, tree: Optional[ast.AST] = None) -> bool:
     """
     Check if code contains any input() calls.
 
     Args:
         code: Python source code
+        tree: Optional pre-parsed AST of code (skips re-parsing)
 
     Returns:
         True if code contains input() calls
     """
-    try:
-        tree = ast.parse(code)
-    except SyntaxError:
-        return False
+    if tree is None:
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return False
 
     for node in ast.walk(tree):
         if isinstance(node, ast.Call):
@@ -432,7 +461,7 @@ def ensure_utf8_header(code: str) -> str:
 
     lines = code.splitlines()
     first_two = "\n".join(lines[:2])
-    if re.search(r"coding[:=]\s*[-\w.]+", first_two):
+    if _CODING_COOKIE_RE.search(first_two):
         return code
 
     encoding_line = "# -*- coding: utf-8 -*-"
@@ -6,8 +6,9 @@ from unittest.mock import MagicMock, Mock
 
 import pytest
 
+import spectral.dual_execution_orchestrator as orchestrator_module
 from spectral.dual_execution_orchestrator import DualExecutionOrchestrator
-from spectral.execution_models import ExecutionMode
+from spectral.execution_models import CodeStep, ExecutionMode, FailureDiagnosis
 
 
 @pytest.fixture
@@ -82,3 +83,225 @@ def test_router_integration(orchestrator):
     mode, confidence = orchestrator.router.classify("Write a program")
     assert mode in [ExecutionMode.DIRECT, ExecutionMode.PLANNING]
     assert 0.0 <= confidence <= 1.0
+
+
+def test_research_and_act_reuses_routed_mode(orchestrator):
+    """Test that RESEARCH_AND_ACT does not classify the request a second time."""
+    orchestrator.router.classify = Mock(return_value=(ExecutionMode.RESEARCH_AND_ACT, 0.9))
+    orchestrator.router.is_pentesting_request = Mock(return_value=False)
+    orchestrator.research_handler.handle_research_query = Mock(return_value=("done", None))
+    orchestrator._execute_direct_mode = Mock(return_value=iter(["ran\n"]))
+
+    output = "".join(orchestrator.process_request("how to use nmap"))
+
+    assert "ran" in output
+    orchestrator.router.classify.assert_called_once()
+
+
+def test_generate_step_code_reuses_identical_prompt(orchestrator, mock_llm_client):
+    """Test that identical step prompts are only sent to the LLM once."""
+    step = Mock(description="Print a greeting", step_number=1)
+
+    first = orchestrator._generate_step_code(step, "say hello")
+    second = orchestrator._generate_step_code(step, "say hello")
+
+    assert first == second
+    assert mock_llm_client.generate.call_count == 1
+
+
+def test_failed_step_code_is_not_reused(orchestrator, mock_llm_client):
+    """Test that code from a failed step is regenerated on the next request."""
+    orchestrator.code_step_breakdown.breakdown_request = Mock(
+        side_effect=lambda *args, **kwargs: [
+            CodeStep(step_number=1, description="Create the data"),
+        ]
+    )
+    orchestrator.execution_monitor.execute_step = Mock(
+        side_effect=lambda step: iter([("Traceback: boom\n", True, "boom")])
+    )
+    orchestrator.adaptive_fix_engine.should_abort_retry = Mock(return_value=True)
+
+    list(orchestrator._execute_planning_mode("analyze data", max_attempts=1))
+    list(orchestrator._execute_planning_mode("analyze data", max_attempts=1))
+
+    assert mock_llm_client.generate.call_count == 2
+
+
+def test_planning_mode_generates_code_for_every_step(orchestrator, mock_llm_client):
+    """Test that prefetched step code is used for each code step."""
+    steps = [
+        CodeStep(step_number=1, description="Create the data"),
+        CodeStep(step_number=2, description="Summarize the data"),
+    ]
+    orchestrator.code_step_breakdown.breakdown_request = Mock(return_value=steps)
+    orchestrator.execution_monitor.execute_step = Mock(
+        side_effect=lambda step: iter([("ok\n", False, None)])
+    )
+
+    output = "".join(orchestrator._execute_planning_mode("analyze data", max_attempts=1))
+
+    assert "Completed: 2/2 steps" in output
+    assert mock_llm_client.generate.call_count == 2
+    assert all(step.code for step in steps)
+
+
+def test_planning_mode_prefetch_is_keyed_by_plan_position(orchestrator, mock_llm_client):
+    """Test that steps sharing a step number each get their own generated code."""
+    mock_llm_client.generate = Mock(side_effect=lambda prompt: f"print({len(prompt)})")
+    steps = [
+        CodeStep(step_number=1, description="Create the data"),
+        CodeStep(step_number=1, description="Summarize all of the data"),
+    ]
+    orchestrator.code_step_breakdown.breakdown_request = Mock(return_value=steps)
+    orchestrator.execution_monitor.execute_step = Mock(
+        side_effect=lambda step: iter([("ok\n", False, None)])
+    )
+
+    "".join(orchestrator._execute_planning_mode("analyze data", max_attempts=1))
+
+    assert steps[0].code != steps[1].code
+
+
+def test_planning_mode_only_prefetches_the_next_step(orchestrator, mock_llm_client):
+    """Test that an aborted plan does not generate code for distant steps."""
+    steps = [CodeStep(step_number=number, description=f"Step {number}") for number in range(1, 6)]
+    orchestrator.code_step_breakdown.breakdown_request = Mock(return_value=steps)
+    orchestrator.execution_monitor.execute_step = Mock(
+        side_effect=lambda step: iter([("Traceback: boom\n", True, "boom")])
+    )
+    orchestrator.adaptive_fix_engine.diagnose_failure = Mock(
+        return_value=FailureDiagnosis(
+            error_type="RuntimeError",
+            error_details="boom",
+            root_cause="boom",
+            suggested_fix="none",
+            fix_strategy="manual",
+        )
+    )
+    orchestrator.adaptive_fix_engine.should_abort_retry = Mock(return_value=True)
+
+    output = "".join(orchestrator._execute_planning_mode("analyze data", max_attempts=1))
+
+    assert "Completed: 0/5 steps" in output
+    # The failed step, and the one prefetched behind it unless it was cancelled
+    assert mock_llm_client.generate.call_count <= 2
+
+
+def test_repeated_step_error_reuses_diagnosis(orchestrator):
+    """Test that an identical error on the same step is diagnosed once."""
+    step = CodeStep(step_number=1, description="Parse the file", code="print(1)")
+    diagnosis = FailureDiagnosis(
+        error_type="ValueError",
+        error_details="bad value",
+        root_cause="bad input",
+        suggested_fix="fix input",
+        fix_strategy="regenerate_code",
+    )
+    orchestrator.adaptive_fix_engine.diagnose_failure = Mock(return_value=diagnosis)
+
+    first = orchestrator._diagnose_step_failure(step, "ValueError", "bad value", "")
+    first.fix_strategy = "stdlib_fallback"
+    second = orchestrator._diagnose_step_failure(step, "ValueError", "bad value", "")
+
+    assert orchestrator.adaptive_fix_engine.diagnose_failure.call_count == 1
+    assert second.fix_strategy == "regenerate_code"
+
+
+def _restart_diagnosis_stores(monkeypatch):
+    """Close open diagnosis stores and forget them, as a process restart would."""
+    for store in orchestrator_module._DIAGNOSIS_STORES.values():
+        store.close()
+    monkeypatch.setattr(orchestrator_module, "_DIAGNOSIS_STORES", {})
+
+
+def test_persisted_diagnosis_survives_restart(mock_llm_client, tmp_path, monkeypatch):
+    """Test that a diagnosis stored by one orchestrator is reused by the next."""
+    monkeypatch.setattr(orchestrator_module, "_DIAGNOSIS_STORES", {})
+    store_path = tmp_path / "diagnoses"
+    step = CodeStep(step_number=1, description="Fetch the page", code="print(1)")
+    diagnosis = FailureDiagnosis(
+        error_type="ImportError",
+        error_details="No module named 'requests'",
+        root_cause="missing package",
+        suggested_fix="use urllib",
+        fix_strategy="stdlib_fallback",
+    )
+
+    first = DualExecutionOrchestrator(llm_client=mock_llm_client, diagnosis_store_path=store_path)
+    first.adaptive_fix_engine.diagnose_failure = Mock(return_value=diagnosis)
+    first._diagnose_step_failure(step, "ImportError", "No module named 'requests'", "")
+    _restart_diagnosis_stores(monkeypatch)
+
+    second = DualExecutionOrchestrator(llm_client=mock_llm_client, diagnosis_store_path=store_path)
+    second.adaptive_fix_engine.diagnose_failure = Mock()
+    restored = second._diagnose_step_failure(step, "ImportError", "No module named 'requests'", "")
+
+    second.adaptive_fix_engine.diagnose_failure.assert_not_called()
+    assert restored.suggested_fix == "use urllib"
+
+    # Different code failing the same way is diagnosed afresh
+    _restart_diagnosis_stores(monkeypatch)
+    third = DualExecutionOrchestrator(llm_client=mock_llm_client, diagnosis_store_path=store_path)
+    third.adaptive_fix_engine.diagnose_failure = Mock(return_value=diagnosis)
+    changed = CodeStep(step_number=1, description="Fetch the page", code="print(2)")
+    third._diagnose_step_failure(changed, "ImportError", "No module named 'requests'", "")
+    third.adaptive_fix_engine.diagnose_failure.assert_called_once()
+    _restart_diagnosis_stores(monkeypatch)
+
+
+def test_fallback_diagnosis_is_not_persisted(mock_llm_client, tmp_path, monkeypatch):
+    """Test that the fallback for a failed diagnosis call is not replayed later."""
+    monkeypatch.setattr(orchestrator_module, "_DIAGNOSIS_STORES", {})
+    store_path = tmp_path / "diagnoses"
+    step = CodeStep(step_number=1, description="Fetch the page", code="print(1)")
+    mock_llm_client.generate = Mock(side_effect=RuntimeError("connection refused"))
+
+    first = DualExecutionOrchestrator(llm_client=mock_llm_client, diagnosis_store_path=store_path)
+    fallback = first._diagnose_step_failure(step, "ValueError", "bad value", "")
+    assert fallback.root_cause.startswith("Unable to diagnose")
+    _restart_diagnosis_stores(monkeypatch)
+
+    second = DualExecutionOrchestrator(llm_client=mock_llm_client, diagnosis_store_path=store_path)
+    second.adaptive_fix_engine.diagnose_failure = Mock(return_value=fallback)
+    second._diagnose_step_failure(step, "ValueError", "bad value", "")
+
+    second.adaptive_fix_engine.diagnose_failure.assert_called_once()
+
+
+def test_diagnosis_store_is_shared_per_path(mock_llm_client, tmp_path, monkeypatch):
+    """Test that orchestrators using the same path share one open store."""
+    monkeypatch.setattr(orchestrator_module, "_DIAGNOSIS_STORES", {})
+    store_path = tmp_path / "diagnoses"
+
+    first = DualExecutionOrchestrator(llm_client=mock_llm_client, diagnosis_store_path=store_path)
+    second = DualExecutionOrchestrator(llm_client=mock_llm_client, diagnosis_store_path=store_path)
+
+    assert first._diagnosis_store is second._diagnosis_store
+    _restart_diagnosis_stores(monkeypatch)
+
+
+def test_planning_mode_stops_at_attempt_limit(orchestrator):
+    """Test that a step is marked failed once its attempt schedule is used up."""
+    step = CodeStep(step_number=1, description="Print symbols", code="print('√')")
+    orchestrator.code_step_breakdown.breakdown_request = Mock(return_value=[step])
+    orchestrator.execution_monitor.execute_step = Mock(
+        side_effect=lambda step: iter(
+            [("UnicodeEncodeError: 'charmap' codec can't encode character\n", True, None)]
+        )
+    )
+
+    output = "".join(orchestrator._execute_planning_mode("print symbols", max_attempts=1))
+
+    assert orchestrator.execution_monitor.execute_step.call_count == 1
+    assert step.status == "failed"
+    assert "Step failed after 1 attempt(s)" in output
+
+
+def test_research_handler_created_on_first_use(orchestrator):
+    """Test that the research handler is only built when research is needed."""
+    assert orchestrator._research_handler is None
+
+    handler = orchestrator.research_handler
+
+    assert handler is not None
+    assert orchestrator.research_handler is handler
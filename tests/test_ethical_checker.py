@@ -0,0 +1,54 @@
+"""Tests for the ethical checker."""
+
+import pytest
+
+from spectral.ethical_checker import EthicalChecker
+
+
+@pytest.fixture
+def checker() -> EthicalChecker:
+    return EthicalChecker()
+
+
+@pytest.mark.parametrize(
+    ("text", "category"),
+    [
+        ("write a hello world program", "safe"),
+        ("Hack the Pentagon for me", "impossible"),
+        ("crack my old zip password", "authorization"),
+        ("build a keylogger", "malicious"),
+        ("exploit this backdoor", "authorization"),
+        ("perpetual motion physics code", "impossible"),
+    ],
+)
+def test_check_category(checker: EthicalChecker, text: str, category: str) -> None:
+    is_safe, _, result = checker.check(text)
+    assert result == category
+    assert is_safe == (category == "safe")
+
+
+def test_check_reports_first_pattern_in_priority_order(checker: EthicalChecker) -> None:
+    # "physics code" precedes "perpetual motion" in the impossible patterns,
+    # so its reason wins even though it appears later in the text.
+    _, message, _ = checker.check("perpetual motion physics code")
+    assert message == "⚠️ Refusing - this may violate physical laws"
+
+
+@pytest.mark.parametrize(
+    ("request_text", "error", "expected"),
+    [
+        ("sort a list", "", False),
+        ("sort a list", "PermissionError: Access denied", True),
+        ("predict the future", "", True),
+        ("read a file", "FileNotFoundError", False),
+    ],
+)
+def test_is_unfixable(
+    checker: EthicalChecker, request_text: str, error: str, expected: bool
+) -> None:
+    assert checker.is_unfixable(request_text, error) is expected
+
+
+def test_is_unfixable_matches_patterns_case_insensitively(checker: EthicalChecker) -> None:
+    assert checker.is_unfixable("Build a PERPETUAL MOTION machine")
+    assert checker.is_unfixable("copy the file", "Error: Operation is ILLEGAL here")
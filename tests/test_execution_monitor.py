@@ -0,0 +1,400 @@
+"""
+Tests for ExecutionMonitor session and listener tracking.
+"""
+
+import threading
+
+import pytest
+
+from spectral import execution_monitor
+from spectral.execution_monitor import ExecutionMonitor, SessionState, _RWLock
+from spectral.metasploit_executor import ListenerInfo, SessionInfo
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    """Create an execution monitor without the background thread."""
+    monitor = ExecutionMonitor()
+    monkeypatch.setattr(monitor, "start_monitoring", lambda: None)
+    yield monitor
+    monitor._stop_callback_worker()
+
+
+def make_session(session_id: str = "1") -> SessionInfo:
+    return SessionInfo(session_id=session_id, session_type="meterpreter", target_ip="10.0.0.5")
+
+
+def make_listener(handler_id: str = "h1") -> ListenerInfo:
+    return ListenerInfo(
+        handler_id=handler_id,
+        lhost="10.0.0.1",
+        lport=4444,
+        payload="windows/meterpreter/reverse_tcp",
+        status="active",
+    )
+
+
+def backdate_session(monitor, session_id: str, seconds: float, state: SessionState):
+    """Put a session in ``state`` as if its last activity was ``seconds`` ago."""
+    session = monitor.active_sessions[session_id]
+    with monitor._sessions_lock.gen_wlock():
+        session.state = state
+        session.last_activity -= seconds
+        monitor._schedule_deadline(session_id, session)
+    return session
+
+
+def test_session_lifecycle(monitor):
+    """Test tracking a session from creation to close."""
+    events = []
+    monitor.add_status_callback(lambda event_type, data: events.append(event_type))
+
+    monitor.track_session_created(make_session("1"))
+    assert monitor.update_session_activity("1", success=True)
+    assert monitor.update_session_activity("1", success=False)
+
+    assert "1" in monitor.get_active_sessions()
+    summary = monitor.get_session_summary()
+    assert summary["active_sessions"] == 1
+    assert summary["total_commands"] == 2
+    assert summary["successful_commands"] == 1
+    assert summary["failed_commands"] == 1
+
+    assert monitor.track_session_closed("1", reason="done")
+    assert not monitor.track_session_closed("1")
+    assert monitor.get_active_sessions() == {}
+    monitor.flush_callbacks()
+    assert events == ["session_created", "session_closed"]
+
+
+def test_created_callback_payload_is_a_copy(monitor):
+    """Test that callbacks cannot mutate the tracked session info."""
+    session = make_session("1")
+    payloads = []
+    monitor.add_status_callback(lambda event_type, data: payloads.append(data))
+
+    monitor.track_session_created(session)
+    monitor.flush_callbacks()
+    payloads[0]["session_info"]["target_ip"] = "changed"
+
+    assert payloads[0]["session_info"]["session_type"] == "meterpreter"
+    assert session.target_ip == "10.0.0.5"
+
+
+def test_listener_lifecycle(monitor):
+    """Test tracking a listener and its connections."""
+    monitor.track_listener_started(make_listener("h1"))
+    assert monitor.increment_listener_connections("h1")
+    assert monitor.increment_listener_connections("h1")
+    assert not monitor.increment_listener_connections("missing")
+
+    assert monitor.get_listener_summary() == {"active_listeners": 1, "total_connections": 2}
+
+    assert monitor.track_listener_stopped("h1")
+    assert monitor.get_listener_summary() == {"active_listeners": 0, "total_connections": 0}
+
+
+def test_summaries_drop_closed_records(monitor):
+    """Test that summary totals only count sessions and listeners still active."""
+    monitor.track_session_created(make_session("1"))
+    monitor.track_session_created(make_session("2"))
+    monitor.update_session_activity("1", success=True)
+    monitor.update_session_activity("2", success=False)
+    monitor.update_session_activity("2", command_executed=False)
+    monitor.track_listener_started(make_listener("h1"))
+    monitor.track_listener_started(make_listener("h2"))
+    monitor.increment_listener_connections("h1")
+    monitor.increment_listener_connections("h2")
+
+    monitor.track_session_closed("2")
+    monitor.track_listener_stopped("h2")
+
+    summary = monitor.get_session_summary()
+    assert summary["active_sessions"] == 1
+    assert summary["total_commands"] == 1
+    assert summary["successful_commands"] == 1
+    assert summary["failed_commands"] == 0
+    assert summary["success_rate"] == 100
+    assert monitor.get_listener_summary() == {"active_listeners": 1, "total_connections": 1}
+
+
+def test_retracking_an_id_resets_its_totals(monitor):
+    """Test that re-tracking an ID drops the replaced record from the totals."""
+    monitor.track_session_created(make_session("1"))
+    for _ in range(3):
+        monitor.update_session_activity("1", success=True)
+    monitor.track_listener_started(make_listener("h1"))
+    monitor.increment_listener_connections("h1")
+
+    monitor.track_session_created(make_session("1"))
+    monitor.track_listener_started(make_listener("h1"))
+    assert monitor.get_session_summary()["total_commands"] == 0
+    assert monitor.get_listener_summary() == {"active_listeners": 1, "total_connections": 0}
+
+    monitor.track_session_closed("1")
+    summary = monitor.get_session_summary()
+    assert summary["active_sessions"] == 0
+    assert summary["total_commands"] == 0
+    assert summary["successful_commands"] == 0
+
+
+def test_active_views_are_read_only_snapshots(monitor):
+    """Test that getters return views unaffected by later changes."""
+    monitor.track_session_created(make_session("1"))
+    monitor.track_listener_started(make_listener("h1"))
+    sessions = monitor.get_active_sessions()
+    listeners = monitor.get_active_listeners()
+
+    monitor.track_session_created(make_session("2"))
+    monitor.track_listener_stopped("h1")
+
+    assert list(sessions) == ["1"]
+    assert list(listeners) == ["h1"]
+    assert set(monitor.get_active_sessions()) == {"1", "2"}
+    assert monitor.get_active_listeners() == {}
+    with pytest.raises(TypeError):
+        sessions["3"] = sessions["1"]
+
+
+def test_execution_history_limit(monitor):
+    """Test that history returns the most recent events up to the limit."""
+    for i in range(5):
+        monitor.track_session_created(make_session(str(i)))
+
+    history = monitor.get_execution_history(limit=2)
+
+    assert [event.event_data["session_id"] for event in history] == ["3", "4"]
+
+
+def test_cleanup_all_closes_everything(monitor):
+    """Test that cleanup closes every tracked session and listener."""
+    monitor.track_session_created(make_session("1"))
+    monitor.track_listener_started(make_listener("h1"))
+
+    monitor.cleanup_all()
+
+    assert monitor.get_active_sessions() == {}
+    assert monitor.get_active_listeners() == {}
+
+
+def test_idle_session_state(monitor):
+    """Test that an inactive session is marked idle and reactivated by activity."""
+    monitor.track_session_created(make_session("1"))
+    session = backdate_session(monitor, "1", 301, SessionState.ACTIVE)
+
+    monitor._update_session_states()
+    assert session.state == SessionState.IDLE
+
+    monitor.update_session_activity("1")
+    assert session.state == SessionState.ACTIVE
+
+
+def test_rwlock_allows_concurrent_readers():
+    """Test that readers share the lock while a writer excludes them."""
+    lock = _RWLock()
+    both_reading = threading.Barrier(2, timeout=2)
+
+    def reader():
+        with lock.gen_rlock():
+            both_reading.wait()
+
+    threads = [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert not both_reading.broken
+
+    with lock.gen_wlock():
+        with lock.gen_wlock():
+            with lock.gen_rlock():
+                pass
+
+
+def test_execution_history_is_bounded(monitor):
+    """Test that the oldest events are dropped once history is full."""
+    monitor.execution_history = type(monitor.execution_history)(maxlen=3)
+    for i in range(5):
+        monitor.track_session_created(make_session(str(i)))
+
+    history = monitor.get_execution_history(limit=10)
+
+    assert [event.event_data["session_id"] for event in history] == ["2", "3", "4"]
+
+
+def test_idle_session_closed_after_timeout(monitor):
+    """Test that a long-idle session is closed by the inactivity check."""
+    monitor.track_session_created(make_session("1"))
+    backdate_session(monitor, "1", 1801, SessionState.IDLE)
+
+    monitor._check_for_inactive_sessions()
+
+    assert "1" not in monitor.active_sessions
+    assert monitor.get_execution_history(limit=1)[0].event_data["reason"] == "timeout"
+
+
+def test_monitor_sleeps_until_next_deadline(monitor):
+    """Test that the monitor wait is bounded by the earliest session deadline."""
+    monitor.track_session_created(make_session("1"))
+    backdate_session(monitor, "1", 290, SessionState.ACTIVE)
+
+    assert 0 < monitor._next_wait_timeout() <= 10.5
+
+
+def test_stop_monitoring_wakes_loop_promptly():
+    """Test that stopping does not wait for the next scheduled wake-up."""
+    monitor = ExecutionMonitor()
+    monitor.start_monitoring()
+    thread = monitor._monitor_thread
+
+    monitor.stop_monitoring()
+
+    assert not thread.is_alive()
+
+
+def test_monitor_thread_runs_only_while_something_is_tracked():
+    """Test that tracking starts the monitor thread and emptying stops it."""
+    monitor = ExecutionMonitor()
+    assert monitor._monitor_thread is None
+
+    monitor.track_session_created(make_session("1"))
+    monitor.track_listener_started(make_listener("h1"))
+    thread = monitor._monitor_thread
+    assert thread.is_alive()
+
+    monitor.track_session_closed("1")
+    assert monitor._monitor_thread is thread
+
+    monitor.track_listener_stopped("h1")
+    thread.join(timeout=2.0)
+    assert not thread.is_alive()
+    assert monitor._monitor_thread is None
+
+    monitor.track_session_created(make_session("2"))
+    assert monitor._monitor_thread.is_alive()
+    monitor.cleanup_all()
+
+
+def test_status_update_only_emitted_after_changes(monitor):
+    """Test that status updates are skipped while nothing has changed."""
+    updates = []
+    monitor.add_status_callback(
+        lambda event_type, data: updates.append(data) if event_type == "status_update" else None
+    )
+
+    monitor._flush_status_update()
+    monitor._flush_status_update()
+    monitor.flush_callbacks()
+    assert len(updates) == 1
+
+    monitor.track_session_created(make_session("1"))
+    monitor._flush_status_update()
+    monitor._flush_status_update()
+    monitor.flush_callbacks()
+    assert len(updates) == 2
+    assert updates[-1]["active_sessions"] == 1
+
+
+def test_activity_supersedes_pending_deadlines(monitor):
+    """Test that deadlines queued before new activity are ignored."""
+    monitor.track_session_created(make_session("1"))
+    session = backdate_session(monitor, "1", 301, SessionState.ACTIVE)
+
+    monitor.update_session_activity("1")
+    monitor._update_session_states()
+    assert session.state == SessionState.ACTIVE
+
+    backdate_session(monitor, "1", 2200, SessionState.ACTIVE)
+    monitor._update_session_states()
+    monitor._check_for_inactive_sessions()
+    assert "1" not in monitor.active_sessions
+
+
+def test_deadline_heaps_stay_bounded(monitor):
+    """Test that repeated activity does not grow the deadline heaps without bound."""
+    monitor.track_session_created(make_session("1"))
+    backdate_session(monitor, "1", 0, SessionState.ACTIVE)
+
+    for _ in range(1000):
+        monitor.update_session_activity("1")
+
+    assert len(monitor._idle_deadlines) < 100
+
+
+def test_callback_removed_while_firing_still_completes_round(monitor):
+    """Test that removing a callback during dispatch does not skip the others."""
+    calls = []
+
+    def first(event_type, data):
+        calls.append("first")
+        monitor.remove_status_callback(first)
+
+    monitor.add_status_callback(first)
+    monitor.add_status_callback(lambda event_type, data: calls.append("second"))
+
+    monitor.track_listener_started(make_listener("h1"))
+    monitor.flush_callbacks()
+    monitor.track_listener_stopped("h1")
+    monitor.flush_callbacks()
+
+    assert calls == ["first", "second", "second"]
+
+
+def test_slow_callback_does_not_block_tracking(monitor):
+    """Test that callbacks run off the tracking thread, in order."""
+    release = threading.Event()
+    seen = []
+
+    def slow(event_type, data):
+        release.wait(timeout=5)
+        seen.append(event_type)
+
+    monitor.add_status_callback(slow)
+    monitor.track_session_created(make_session("1"))
+    monitor.track_session_closed("1")
+    assert seen == []
+
+    release.set()
+    monitor.flush_callbacks()
+    assert seen == ["session_created", "session_closed"]
+
+
+def test_callback_events_dropped_when_queue_full(monkeypatch):
+    """Test that a stuck callback makes events drop rather than block tracking."""
+    monkeypatch.setattr(execution_monitor, "_CALLBACK_QUEUE_MAX", 1)
+    monitor = ExecutionMonitor()
+    release = threading.Event()
+    monitor.add_status_callback(lambda event_type, data: release.wait(timeout=5))
+
+    for i in range(5):
+        monitor.track_listener_started(make_listener(f"h{i}"))
+
+    assert monitor._dropped_callbacks >= 3
+    release.set()
+    monitor._stop_callback_worker()
+
+
+def test_status_update_payload(monitor):
+    """Test the per-session and per-listener entries of a status update."""
+    updates = []
+    monitor.add_status_callback(
+        lambda event_type, data: updates.append(data) if event_type == "status_update" else None
+    )
+    monitor.track_session_created(make_session("1"))
+    monitor.track_listener_started(make_listener("h1"))
+    monitor.increment_listener_connections("h1")
+
+    monitor._flush_status_update()
+    monitor.flush_callbacks()
+
+    session = updates[-1]["sessions"]["1"]
+    assert session["type"] == "meterpreter"
+    assert session["target"] == "10.0.0.5"
+    assert session["state"] == "creating"
+    assert session["age"] >= 0
+    assert updates[-1]["listeners"]["h1"] == {
+        "payload": "windows/meterpreter/reverse_tcp",
+        "endpoint": "10.0.0.1:4444",
+        "state": "starting",
+        "connections": 1,
+    }
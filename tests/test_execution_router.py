@@ -4,7 +4,7 @@ Tests for execution router module.
 
 import pytest
 
-from spectral.execution_router import ExecutionMode, ExecutionRouter
+from spectral.execution_router import ExecutionMode, ExecutionRouter, _PhraseMatcher
 
 
 @pytest.fixture
@@ -43,3 +43,180 @@ def test_is_planning_mode(router):
     assert router.is_planning_mode("Build a web scraper with error handling and logging")
     assert router.is_planning_mode("Create an application with multiple features")
     assert not router.is_planning_mode("Run this code")
+
+
+@pytest.mark.parametrize(
+    "user_input, expected",
+    [
+        ("How to use nmap for host discovery", (True, "nmap")),
+        ("show me how to use requests", (True, "requests")),
+        ("Can you demonstrate scapy?", (True, "scapy")),
+        ("teach me pandas", (True, "pandas")),
+        ("how to use json in python", (False, None)),
+        ("how to use os and then teach me paramiko", (True, "paramiko")),
+        ("I want to learn how to use pandas", (True, "pandas")),
+        ("teach me how to use scapy", (True, "scapy")),
+        ("write a script that lists files", (False, None)),
+    ],
+)
+def test_should_research(router, user_input, expected):
+    """Test detection of tool research requests and the stdlib exclusion."""
+    assert router.should_research(user_input) == expected
+
+
+@pytest.mark.parametrize(
+    "user_input, expected",
+    [
+        ("Use msfconsole to get a meterpreter session", True),
+        ("exploitation of the target", True),  # "exploit" and "exploitation" both count
+        ("run a port scan", True),  # "port scan" and "scan"
+        ("write a hello world script", False),
+        ("generate a payload", False),
+        ("build a payload for linux", True),  # one keyword, explicit pattern
+        ("scan the target", True),
+        ("linux payloads please", False),  # patterns are word-bounded and ordered
+    ],
+)
+def test_is_pentesting_request(router, user_input, expected):
+    """Test pentesting detection, counting keywords nested in longer ones."""
+    assert router.is_pentesting_request(user_input) is expected
+
+
+def test_phrase_matcher_counts_like_substring_checks():
+    """Test that the one-pass matcher agrees with per-phrase substring checks."""
+    phrases = ["ab", "abc", "abd", "b", "bc", "cab"]
+    matcher = _PhraseMatcher(phrases)
+
+    for text in ["", "xyz", "abc", "cabd", "abdbc", "ab ab", "cabcab"]:
+        assert matcher.count(text) == sum(phrase in text for phrase in phrases)
+    assert matcher.count("abc xyz", stop_at=2) >= 2
+
+
+@pytest.mark.parametrize(
+    "user_input, expected",
+    [
+        ("What is your name?", (ExecutionMode.DIRECT, 0.3)),
+        ("Tell me about yourself and what tools you know", (ExecutionMode.DIRECT, 0.3)),
+        ("Show me broken code on purpose so I can debug it", (ExecutionMode.DIRECT, 0.7)),
+        ("Can you analyze and create a report for this log", (ExecutionMode.PLANNING, 0.8)),
+        ("Build a tool with persistence and exfil", (ExecutionMode.PLANNING, 0.8)),
+    ],
+)
+def test_classify_early_exits(router, user_input, expected):
+    """Test the phrase-based early exits in classification."""
+    assert router.classify(user_input) == expected
+
+
+def test_classify_caches_normalized_input(router, monkeypatch):
+    """Test that repeated classification of the same request is served from cache."""
+    calls = []
+    original = router._is_simple_direct_request
+    monkeypatch.setattr(
+        router, "_is_simple_direct_request", lambda *args: calls.append(args) or original(*args)
+    )
+
+    first = router.classify("list files in this folder")
+    assert router.classify("  List files in this folder ") == first
+    assert router.is_direct_mode("list files in this folder")
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize(
+    "user_input, expected",
+    [
+        ("run it", (ExecutionMode.DIRECT, 0.85)),
+        ("check install errors", (ExecutionMode.DIRECT, 0.85)),
+        ("thanks a lot", (ExecutionMode.DIRECT, 0.4)),
+    ],
+)
+def test_classify_short_inputs(router, user_input, expected):
+    """Test the routing table for inputs under four words."""
+    assert router.classify(user_input) == expected
+
+
+def test_classify_short_technical_input_falls_through(router):
+    """Test that a short technical input without an action verb gets full scoring."""
+    mode, confidence = router.classify("pip install error")
+
+    assert (mode, confidence) != (ExecutionMode.DIRECT, 0.4)
+
+
+def test_question_words_match_whole_leading_word(router):
+    """Test that only a whole leading question word adds to the research score."""
+    # "is" is not a question word inside "issue"
+    mode, confidence = router.classify("Issue tracker pipeline for windows")
+    assert mode == ExecutionMode.PLANNING
+    assert confidence == pytest.approx(0.62)
+    assert router.classify("what ports are open on this machine") == (ExecutionMode.DIRECT, 0.85)
+
+
+@pytest.mark.parametrize(
+    "user_input, is_greeting",
+    [
+        ("hello", True),
+        ("Hi there, can you help with scripting", True),
+        ("how are you doing today my friend", True),
+        ("hiking trails near me for the weekend", False),
+        ("show me the hidden files in this folder", False),
+    ],
+)
+def test_classify_greetings(router, user_input, is_greeting):
+    """Test that only whole leading greeting words take the greeting exit."""
+    assert (router.classify(user_input) == (ExecutionMode.DIRECT, 0.3)) is is_greeting
+
+
+@pytest.mark.parametrize(
+    "user_input, expected",
+    [
+        ("check if the port is open", False),
+        ("check if the port is open then close it", True),
+        ("copy the file and then zip it", True),
+        ("copy the file", False),
+        ("if it fails then retry", True),
+    ],
+)
+def test_is_complex_request_markers(router, user_input, expected):
+    """Test the conditional and multi-step markers of the complexity check."""
+    assert router._is_complex_request(user_input, user_input.split()) is expected
+
+
+@pytest.mark.parametrize(
+    "user_input, expected_confidence",
+    [
+        ("i need a scraper for images", 0.65),
+        # "web scraper" and "scraper" both count
+        ("i need a web scraper for images", 0.8),
+        # A repeated indicator counts once (plus 0.3 for two conjunctions)
+        ("i need a scraper for images with logging and logging", 0.89),
+    ],
+)
+def test_classify_counts_each_complexity_indicator_once(router, user_input, expected_confidence):
+    """Test that nested indicators all count, but repeats of one count once."""
+    mode, confidence = router.classify(user_input)
+    assert mode == ExecutionMode.PLANNING
+    assert confidence == pytest.approx(expected_confidence)
+
+
+def test_classify_batch_matches_classify(router):
+    """Test that batch classification agrees with classify, in input order."""
+    inputs = [
+        "list files in this folder",
+        "how do I use nmap?",
+        "  List files in this folder ",
+        "build a web scraper with error handling and logging",
+    ]
+
+    cache_before = ExecutionRouter._classify.cache_info()
+    results = router.classify_batch(inputs)
+    assert ExecutionRouter._classify.cache_info() == cache_before
+
+    assert results == [router.classify(user_input) for user_input in inputs]
+    assert results[0] == results[2]
+
+
+def test_count_keywords_counts_every_category_of_a_word(router):
+    """Test that words in several keyword sets count toward each of them."""
+    # "then" is both a planning keyword and a conjunction
+    words = "run the tests then build it and deploy".split()
+
+    assert router._count_keywords(words) == (2, 2, 2)
@@ -258,6 +258,40 @@ def broken_function(
         assert result.status == "syntax_error"
         assert not result.gates_passed["syntax"]
 
+    def test_syntax_error_skips_subprocess(self, monkeypatch):
+        """Test syntax errors are caught in-process without spawning Python."""
+        run_id = self.manager.create_run()
+        calls = []
+        monkeypatch.setattr(
+            self.manager.process_controller,
+            "run_subprocess",
+            lambda *args, **kwargs: calls.append(kwargs),
+        )
+
+        result = self.manager.execute_verification_pipeline(
+            run_id=run_id,
+            code="def broken(:\n    pass\n",
+            filename="broken.py",
+        )
+
+        assert result.status == "syntax_error"
+        assert "Syntax Error" in result.error_message
+        assert result.code_path.exists()
+        assert calls == []
+
+    def test_uncompilable_nesting_fails_syntax_gate(self):
+        """Test sources too deeply nested to compile fail the gate instead of raising."""
+        run_id = self.manager.create_run()
+
+        result = self.manager.execute_verification_pipeline(
+            run_id=run_id,
+            code="x = " + "-" * 100000 + "1\n",
+            filename="nested.py",
+        )
+
+        assert result.status == "syntax_error"
+        assert not result.gates_passed["syntax"]
+
     def test_cleanup_run(self):
         """Test sandbox cleanup."""
         run_id = self.manager.create_run()
@@ -10,6 +10,7 @@ Validates that:
 """
 
 import logging
+import subprocess
 import pytest
 from pathlib import Path
 from typing import List, Dict, Any
@@ -183,6 +184,34 @@ class TestCodeGenerationStreaming:
 
         logger.info("✅ TEST #4 PASSED: code_generated event contains complete, cleaned code")
 
+    def test_metasploit_sequence_events_delivered_live(self, direct_executor_with_callback):
+        """Batched command events reach the GUI before each command blocks."""
+        executor = direct_executor_with_callback
+        delivered_before_run: List[List[str]] = []
+
+        def delivered_types() -> List[str]:
+            types = []
+            for event_type, data in executor._gui_events:
+                if event_type == "gui_events_batch":
+                    types.extend(inner_type for inner_type, _ in data["events"])
+                else:
+                    types.append(event_type)
+            return types
+
+        def fake_run(*args, **kwargs):
+            delivered_before_run.append(delivered_types())
+            return subprocess.CompletedProcess(args, 0, stdout="ok")
+
+        with patch("spectral.direct_executor.subprocess.run", side_effect=fake_run):
+            results = executor.execute_metasploit_interactive(
+                ["msfconsole -v", "msfvenom -l"], show_terminal=False
+            )
+
+        assert results == [(0, "ok"), (0, "ok")]
+        assert delivered_before_run[0].count("command_start") == 1
+        assert delivered_before_run[1].count("command_start") == 2
+        assert delivered_types().count("command_complete") == 2
+
 
 class TestSandboxViewerReceivesChunks:
     """Test that SandboxViewer properly receives and displays chunks."""